@@ -0,0 +1,125 @@
+"""
+Cache Utilities Module
+Small in-process caches for expensive remote lookups (YouTube, OpenAI, web search)
+"""
+
+import time
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Hashable, List, Optional
+
+import numpy as np
+
+
+class TTLCache:
+    """
+    Bounded LRU cache whose entries expire after `ttl` seconds.
+
+    Safe to share between the event loop and worker threads.
+    Pass `ttl=None` for a plain LRU cache without expiry.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data: "OrderedDict[Hashable, tuple]" = OrderedDict()
+        self._lock = Lock()
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """Return the cached value for key, or default if missing/expired"""
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return default
+            expires_at, value = entry
+            if expires_at is not None and expires_at < time.monotonic():
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Store value under key, evicting the least recently used entry when full"""
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._data[key] = (expires_at, value)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+class SemanticCache:
+    """
+    Cache keyed by embedding vectors instead of exact inputs.
+    
+    A lookup hits when a stored vector's cosine similarity to the query is at
+    least `threshold`, so near-duplicate requests share one expensive result.
+    Vectors must be unit length. Holds at most `maxsize` entries, replacing
+    the oldest first. Vectors stay float32: int8 storage would be upcast on
+    every lookup's matmul, making probes slower for a small memory saving.
+    Entries expire after `ttl` seconds (`ttl=None` keeps them until replaced).
+    """
+    
+    def __init__(self, maxsize: int = 1024, threshold: float = 0.92, ttl: Optional[float] = None):
+        self.maxsize = maxsize
+        self.threshold = threshold
+        self.ttl = ttl
+        self._vectors: Optional[np.ndarray] = None  # (maxsize, dim), allocated on first set
+        self._expires: Optional[np.ndarray] = None  # float64 (maxsize,), monotonic expiry per row
+        self._values: List[Any] = []
+        self._next = 0  # Slot the next entry overwrites once full
+        self._lock = Lock()
+    
+    def get(self, vector: np.ndarray, default: Any = None) -> Any:
+        """Return the value of the most similar stored vector, or default below threshold"""
+        with self._lock:
+            if not self._values:
+                return default
+            count = len(self._values)
+            similarities = self._vectors[:count] @ vector
+            if self.ttl is not None:
+                similarities[self._expires[:count] < time.monotonic()] = -np.inf
+            best = int(similarities.argmax())
+            if similarities[best] < self.threshold:
+                return default
+            return self._values[best]
+    
+    def set(self, vector: np.ndarray, value: Any) -> None:
+        """Store value under vector, replacing the oldest entry when full"""
+        with self._lock:
+            if self._vectors is None:
+                self._vectors = np.zeros((self.maxsize, len(vector)), dtype=np.float32)
+                self._expires = np.full(self.maxsize, np.inf)
+            if len(self._values) < self.maxsize:
+                slot = len(self._values)
+                self._values.append(value)
+            else:
+                slot = self._next
+                self._values[slot] = value
+                self._next = (self._next + 1) % self.maxsize
+            self._vectors[slot] = vector
+            if self.ttl is not None:
+                self._expires[slot] = time.monotonic() + self.ttl
+    
+    def clear(self) -> None:
+        with self._lock:
+            self._vectors = None
+            self._expires = None
+            self._values = []
+            self._next = 0
+    
+    def __len__(self) -> int:
+        return len(self._values)
+
+
+_MISSING = object()
@@ -0,0 +1,37 @@
+"""
+Embeddings Module
+Shared OpenAI text-embedding helper for similarity-based matching
+"""
+
+from typing import List
+import numpy as np
+from openai import OpenAI
+from config import OPENAI_API_KEY
+
+OPENAI_CLIENT = OpenAI(api_key=OPENAI_API_KEY)
+
+EMBEDDING_MODEL = "text-embedding-3-small"
+EMBEDDING_MAX_CHARS = 8000  # Keep each input well under the model's token limit
+EMBEDDING_BATCH_SIZE = 2048  # API limit on inputs per request
+
+
+def embed_texts(texts: List[str]) -> np.ndarray:
+    """
+    Embed texts with the OpenAI embeddings API.
+
+    Args:
+        texts: Texts to embed (long texts are truncated)
+
+    Returns:
+        float32 matrix with one unit-length row per text, so a dot product
+        between rows is their cosine similarity
+    """
+    vectors = []
+    for i in range(0, len(texts), EMBEDDING_BATCH_SIZE):
+        # The API rejects empty strings
+        batch = [text[:EMBEDDING_MAX_CHARS] or " " for text in texts[i:i + EMBEDDING_BATCH_SIZE]]
+        response = OPENAI_CLIENT.embeddings.create(model=EMBEDDING_MODEL, input=batch)
+        vectors.extend(item.embedding for item in response.data)
+
+    matrix = np.array(vectors, dtype=np.float32)
+    return matrix / np.linalg.norm(matrix, axis=1, keepdims=True)
@@ -0,0 +1,100 @@
+"""
+Keyword Matcher Module
+Aho-Corasick automaton for scanning text against many keywords in a single pass
+"""
+
+from collections import deque
+from typing import Dict, Iterable, Iterator, List, Tuple
+
+
+class KeywordAutomaton:
+    """
+    Aho-Corasick automaton over a fixed keyword list.
+
+    Build it once (e.g. at module import) and reuse it: each scan is one
+    linear pass over the text no matter how many keywords are registered.
+    Matching is case-sensitive, so lowercase both keywords and text for
+    case-insensitive scans.
+    """
+
+    def __init__(self, keywords: Iterable[str]):
+        self.keywords: Tuple[str, ...] = tuple(dict.fromkeys(kw for kw in keywords if kw))
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[Tuple[int, ...]] = [()]
+
+        # Trie of all keywords
+        for index, keyword in enumerate(self.keywords):
+            state = 0
+            for char in keyword:
+                next_state = self._goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][char] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append(())
+                state = next_state
+            self._output[state] += (index,)
+
+        # Failure links (breadth-first), inheriting outputs of the fallback state
+        order = []
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            order.append(state)
+            for char, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[next_state] = self._goto[fallback].get(char, 0)
+                self._output[next_state] += self._output[self._fail[next_state]]
+
+        # Fold the failure links into a full DFA: each state inherits its fallback
+        # state's transitions, so scanning is exactly one dict lookup per character.
+        # Characters absent from a state's table lead back to the root.
+        self._delta: List[Dict[str, int]] = [{} for _ in self._goto]
+        self._delta[0] = dict(self._goto[0])
+        for state in order:
+            self._delta[state] = {**self._delta[self._fail[state]], **self._goto[state]}
+
+    def iter(self, text: str) -> Iterator[Tuple[int, int]]:
+        """Yield (end_index, keyword_index) for every occurrence, overlaps included"""
+        delta, output = self._delta, self._output
+        state = 0
+        for position, char in enumerate(text):
+            state = delta[state].get(char, 0)
+            for index in output[state]:
+                yield position, index
+
+    def count_by_index(self, text: str) -> List[int]:
+        """
+        Count non-overlapping occurrences of every keyword in text.
+
+        Returns one count per entry of `self.keywords`, matching `text.count(keyword)`.
+        """
+        counts = [0] * len(self.keywords)
+        next_free = [0] * len(self.keywords)
+        for end, index in self.iter(text):
+            start = end - len(self.keywords[index]) + 1
+            if start >= next_free[index]:
+                counts[index] += 1
+                next_free[index] = end + 1
+        return counts
+
+    def count(self, text: str) -> Dict[str, int]:
+        """
+        Count non-overlapping occurrences of each keyword found in text.
+
+        Counts match `text.count(keyword)`; keywords that do not occur are omitted.
+        """
+        return {
+            self.keywords[index]: occurrences
+            for index, occurrences in enumerate(self.count_by_index(text))
+            if occurrences
+        }
+
+    def contains_any(self, text: str) -> bool:
+        """Check whether any keyword occurs in text"""
+        return next(self.iter(text), None) is not None
@@ -7,6 +7,12 @@ import requests
 from typing import List, Dict, Optional
 from bs4 import BeautifulSoup
 import urllib.parse
+from cache_utils import TTLCache
+
+# Aggregated results per query; queries come from the pattern library, so the
+# same handful repeat across users and every hit skips four HTTP round trips
+KNOWLEDGE_CACHE_TTL = 3600
+_knowledge_cache = TTLCache(maxsize=256, ttl=KNOWLEDGE_CACHE_TTL)
 
 
 def search_github_repos(query: str, max_results: int = 5) -> List[Dict[str, str]]:
@@ -220,11 +226,19 @@ def get_external_knowledge(pattern_query: str) -> Dict[str, List[Dict]]:
     Returns:
         Dict with github_repos, stackoverflow_threads, dev_articles
     """
+    cached = _knowledge_cache.get(pattern_query)
+    if cached is not None:
+        return {source: list(items) for source, items in cached.items()}
+    
     print(f"🔍 Searching external knowledge for: {pattern_query}")
     
-    return {
+    results = {
         "github_repos": search_github_repos(pattern_query),
         "stackoverflow_threads": search_stackoverflow(pattern_query),
         "dev_articles": search_dev_articles(pattern_query),
         "medium_articles": search_medium_articles(pattern_query)
     }
+    # Don't pin an outage (every source empty) for the whole TTL
+    if any(results.values()):
+        _knowledge_cache.set(pattern_query, results)
+    return {source: list(items) for source, items in results.items()}
@@ -1,9 +1,9 @@
-import sys, os, uuid, re, json
+import sys, os, uuid, re, json, asyncio
 from enum import Enum
 from typing import List, Optional, Dict
 from fastapi import FastAPI, HTTPException, BackgroundTasks, Depends, File, UploadFile, Form, Request, Query
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import FileResponse, RedirectResponse
+from fastapi.responses import FileResponse, Response
 from fastapi.staticfiles import StaticFiles
 from pydantic import BaseModel
 import uvicorn
@@ -21,20 +21,32 @@ import pattern_detector
 import knowledge_search
 import debug_analyzer
 import video_transcript_analyzer
+import transcript_cache
 import advanced_code_analyzer
+from cache_utils import TTLCache
 from openai import OpenAI
 OPENAI_CLIENT = OpenAI(api_key=OPENAI_API_KEY)
 
 import whisper
 from googleapiclient.discovery import build
+import atexit
 import logging
+import logging.handlers
+import queue
 import subprocess
 import json
 import tempfile
 from fastapi.responses import StreamingResponse
-
-# Setup logging
-logging.basicConfig(level=logging.INFO)
+from fastapi.encoders import jsonable_encoder
+
+# Setup logging: handlers only enqueue records and a listener thread writes
+# them to stderr, so request handlers never wait on the stream lock.
+# force=True replaces the plain handler video_compile installs on import.
+_log_queue = queue.SimpleQueue()
+_log_listener = logging.handlers.QueueListener(_log_queue, logging.StreamHandler())
+logging.basicConfig(level=logging.INFO, handlers=[logging.handlers.QueueHandler(_log_queue)], force=True)
+_log_listener.start()
+atexit.register(_log_listener.stop)
 logger = logging.getLogger(__name__)
 
 # ---------------- APP ----------------
@@ -196,17 +208,20 @@ class ChatResponse(BaseModel):
     error_analysis: Optional[str] = None
 
 # ---------------- HELPERS ----------------
-async def get_gpt4o_response(prompt: str, temperature: float = 0.3):
+async def get_gpt4o_response(prompt: str, temperature: float = 0.3, response_format: Optional[dict] = None):
     """
     Get response from GPT-4o model.
     Lower temperature (0.3) for more deterministic, focused responses.
+    Pass response_format={"type": "json_object"} to force a bare JSON object reply.
     """
     try:
+        extra = {"response_format": response_format} if response_format else {}
         res = OPENAI_CLIENT.chat.completions.create(
             model="gpt-4o",
             messages=[{"role": "user", "content": prompt}],
             max_tokens=3000,
-            temperature=temperature
+            temperature=temperature,
+            **extra
         )
         return res.choices[0].message.content.strip()
     except Exception as e:
@@ -217,6 +232,11 @@ def parse_segments(text: str):
     pattern = r"\[(\d+\.?\d*)\s*-\s*(\d+\.?\d*)\]"
     return [(float(s), float(e)) for s, e in re.findall(pattern, text)]
 
+# Search results per query; pattern-derived queries repeat across users,
+# so this saves both latency and YouTube API quota
+YOUTUBE_SEARCH_CACHE_TTL = 6 * 3600
+_youtube_search_cache = TTLCache(maxsize=256, ttl=YOUTUBE_SEARCH_CACHE_TTL)
+
 async def search_youtube(query: str):
     """Search YouTube videos - returns list of video dicts"""
     if not YOUTUBE_API_KEY:
@@ -225,9 +245,14 @@ async def search_youtube(query: str):
         # Placeholder videos cause issues with transcript checking
         return []
     
+    cached = _youtube_search_cache.get(query)
+    if cached is not None:
+        return list(cached)
+    
     try:
         youtube = build("youtube", "v3", developerKey=YOUTUBE_API_KEY)
-        res = youtube.search().list(q=query, part="snippet", type="video", maxResults=3).execute()
+        request = youtube.search().list(q=query, part="snippet", type="video", maxResults=3)
+        res = await asyncio.to_thread(request.execute)
         
         videos = []
         for i in res.get("items", []):
@@ -238,11 +263,146 @@ async def search_youtube(query: str):
                 "channel": i["snippet"]["channelTitle"],
             })
         
-        return videos
+        if videos:
+            _youtube_search_cache.set(query, videos)
+        return list(videos)
     except Exception as e:
         logger.error(f"YouTube search error: {e}", exc_info=True)
         return []  # Return empty list on error
 
+# In-flight timestamp extractions keyed on (video_url, keywords_hash), so
+# concurrent requests for the same pattern share one transcript fetch
+_inflight_timestamps: Dict[tuple, asyncio.Task] = {}
+
+async def extract_timestamps_once(video_url: str, pattern_name: str, pattern_keywords: List[str], keywords_hash: str):
+    """Run extract_solution_timestamps, joining an identical extraction already in flight"""
+    key = (video_url, keywords_hash)
+    task = _inflight_timestamps.get(key)
+    if task is None:
+        task = asyncio.ensure_future(asyncio.to_thread(
+            video_transcript_analyzer.extract_solution_timestamps,
+            video_url=video_url,
+            pattern_name=pattern_name,
+            pattern_keywords=pattern_keywords
+        ))
+        _inflight_timestamps[key] = task
+        task.add_done_callback(lambda _: _inflight_timestamps.pop(key, None))
+    # Shield so one cancelled request does not cancel the fetch for the others
+    return await asyncio.shield(task)
+
+async def find_pattern_video_segments(primary_pattern_key: str, primary_pattern_name: str):
+    """
+    Search YouTube for the pattern and extract transcript-based solution timestamps.
+    
+    Returns:
+        Tuple of (raw_videos, video_segments, video_skip_reasons)
+    """
+    video_query = f"{primary_pattern_name} tutorial solution"
+    raw_videos = await search_youtube(video_query)
+    
+    pattern_keywords = pattern_detector.get_pattern_keywords(primary_pattern_key)
+    keywords_hash = transcript_cache.keywords_hash(pattern_keywords)
+    
+    async def cached_timestamps(video_id):
+        """Previously extracted timestamps for a video, which skip both YouTube round-trips"""
+        if not video_id:
+            return None
+        return await asyncio.to_thread(transcript_cache.get, video_id, keywords_hash)
+    
+    async def process_video(vid, video_id, timestamps):
+        """Build the VideoSegment for one video; returns (segment, skip_reason)"""
+        video_url = vid.get("url", "")
+        video_title = vid.get("title", "Video")
+        
+        if timestamps:
+            has_transcript, skip_reason = True, None
+        else:
+            # Check if transcript/audio available
+            has_transcript, skip_reason = await asyncio.to_thread(
+                video_transcript_analyzer.check_audio_availability, video_url
+            )
+        
+        # Try to extract timestamps if transcript is available
+        if has_transcript and not timestamps:
+            try:
+                timestamps = await extract_timestamps_once(
+                    video_url, primary_pattern_name, pattern_keywords, keywords_hash
+                )
+                if timestamps and video_id:
+                    await asyncio.to_thread(transcript_cache.put, video_id, keywords_hash, timestamps)
+            except Exception as e:
+                logger.warning(f"Failed to extract timestamps from {video_url}: {e}")
+                has_transcript = False
+                skip_reason = f"Timestamp extraction failed: {str(e)[:50]}"
+        
+        # Fields shared by every variant; the branches below only override what differs
+        base = dict(
+            title=video_title,
+            url=video_url,
+            video_id=video_id,
+            thumbnail=vid.get("thumbnail"),
+            channel=vid.get("channel"),
+            start_time=None,
+            end_time=None,
+            transcript_text="",
+            highlighted_portion=""
+        )
+        
+        # Add video even if transcript is not available (but note it)
+        if timestamps:
+            # Video with timestamps - full featured
+            print(f"   ✓ Extracted: [{timestamps['start_formatted']} - {timestamps['end_formatted']}]")
+            extra = dict(
+                start_time=timestamps["start_formatted"],
+                end_time=timestamps["end_formatted"],
+                relevance_note=f"Covers {primary_pattern_name} solution ({timestamps['confidence']} confidence)",
+                transcript_text=timestamps.get("transcript_text", ""),
+                highlighted_portion=timestamps.get("highlighted_portion", "")
+            )
+            skip = None
+        elif has_transcript:
+            # Video has transcript but pattern not found - still show it
+            print(f"   ✓ Added video (no timestamps found)")
+            extra = dict(relevance_note=f"Video about {primary_pattern_name} (no specific timestamps found)")
+            skip = None
+        else:
+            # No transcript - still show video but note it
+            print(f"   ⚠️  Added video without transcript: {skip_reason}")
+            extra = dict(relevance_note=f"Video about {primary_pattern_name} (transcript unavailable - watch full video)")
+            skip = f"{video_title[:50]}... - {skip_reason}"
+        
+        return VideoSegment(**{**base, **extra}), skip
+    
+    # Look up each video's cached timestamps once, concurrently
+    top_videos = raw_videos[:3]
+    video_ids = [video_transcript_analyzer.extract_video_id(vid.get("url", "")) for vid in top_videos]
+    cached = await asyncio.gather(*(cached_timestamps(video_id) for video_id in video_ids))
+    
+    # Transcript fetches are independent per video, so process the top 3 concurrently
+    results = await asyncio.gather(
+        *(
+            process_video(vid, video_id, timestamps)
+            for vid, video_id, timestamps in zip(top_videos, video_ids, cached)
+        ),
+        return_exceptions=True
+    )
+    
+    video_segments = []
+    video_skip_reasons = []
+    for vid, result in zip(top_videos, results):
+        if isinstance(result, Exception):
+            logger.warning(f"Failed to process video {vid.get('url', '')}: {result}")
+            video_skip_reasons.append(f"{vid.get('title', 'Video')[:50]}... - Video processing failed")
+            continue
+        segment, skip_reason = result
+        video_segments.append(segment)
+        if skip_reason:
+            video_skip_reasons.append(skip_reason)
+    
+    print(f"   ✓ Processed {len(video_segments)} videos, skipped {len(video_skip_reasons)}")
+    
+    return raw_videos, video_segments, video_skip_reasons
+
 # ---------------- VIDEO PROCESSING HELPERS ----------------
 def check_ffmpeg_available() -> tuple[bool, str]:
     """
@@ -1901,13 +2061,14 @@ async def chat_advanced(req: ChatRequest, user=Depends(auth.get_current_user)):
     return analysis_result
 
 
-@app.post("/api/chat", response_model=ChatResponse)
-async def chat(req: ChatRequest, user=Depends(auth.get_current_user)):
+async def chat_pipeline_events(req: ChatRequest, user):
     """
-    ENHANCED Pattern Intelligence Layer - Chat endpoint
-    PRIMARY PATTERN FIRST - MANDATORY RULE ENFORCEMENT
+    Run the chat pipeline, yielding (stage, fields) as each step completes.
     
-    If use_advanced_analysis is True, uses advanced deterministic analysis
+    `fields` holds the ChatResponse fields produced by that stage, so clients
+    can merge them into a partial response. Streamed steps also emit
+    ("<step>_delta", {"delta": text}) events with partial text ahead of their
+    stage event. The last event is always ("complete", ChatResponse).
     """
     # Check if advanced analysis is requested
     if req.use_advanced_analysis and req.code:
@@ -1920,7 +2081,7 @@ async def chat(req: ChatRequest, user=Depends(auth.get_current_user)):
         )
         
         # Convert to ChatResponse format
-        return ChatResponse(
+        yield "complete", ChatResponse(
             primary_pattern=advanced_result["specific_pattern_or_algorithm"],
             primary_pattern_explanation=advanced_result["solution"]["explanation"],
             secondary_issues=[err["description"] for err in advanced_result["errors_detected"]],
@@ -1940,6 +2101,7 @@ async def chat(req: ChatRequest, user=Depends(auth.get_current_user)):
             youtube_videos=[],
             error_analysis=None
         )
+        return
     
     print(f"\n{'='*60}")
     print(f"🧠 ENHANCED PATTERN INTELLIGENCE SYSTEM")
@@ -1949,7 +2111,7 @@ async def chat(req: ChatRequest, user=Depends(auth.get_current_user)):
     
     # Step 1: PRIMARY/SECONDARY Pattern Detection (RULE ENFORCED)
     print("\n[1/7] 🔍 Detecting PRIMARY + SECONDARY patterns...")
-    pattern_result = pattern_detector.detect_primary_and_secondary_patterns(
+    pattern_result = await pattern_detector.detect_primary_and_secondary_patterns(
         code=req.code,
         error_message=req.message,
         user_message=req.message
@@ -1964,125 +2126,131 @@ async def chat(req: ChatRequest, user=Depends(auth.get_current_user)):
     print(f"   ✓ PRIMARY: {primary_pattern_name} (confidence: {confidence}%)")
     print(f"   ✓ SECONDARY: {secondary_issues if secondary_issues else 'None'}")
     
-    # Step 2: Pattern Explanation
-    print("[2/7] 📝 Generating pattern explanation...")
-    pattern_explanation = pattern_detector.generate_pattern_explanation(
-        pattern_key=primary_pattern_key,
-        code=req.code,
-        error=req.message
-    )
-    print(f"   ✓ Explanation generated")
+    # PRIMARY Pattern (ALWAYS FIRST - Rule Enforced), plus legacy-compatible fields
+    response_fields = {
+        "primary_pattern": primary_pattern_name,
+        "pattern_name": primary_pattern_name,
+        "secondary_issues": secondary_issues,
+        "confidence_score": confidence,
+        "learning_intent": learning_intent,
+    }
+    yield "primary_pattern", dict(response_fields)
     
-    # Step 3: Generate Solution
-    print("[3/7] 💡 Generating pattern-based solution...")
-    corrected_code = None
+    # Steps 2-6 only depend on the Step 1 pattern, so run them concurrently
+    print("[2-6/7] ⚡ Running explanation, solution, knowledge, video and debug steps concurrently...")
+    search_query = pattern_detector.map_pattern_to_search_query(primary_pattern_key)
+    
+    # With code, Steps 2 and 3 share one GPT call that returns both results
+    combined = None
     if req.code:
-        corrected_code = pattern_detector.get_pattern_solution(
+        combined = asyncio.ensure_future(pattern_detector.generate_explanation_and_solution(
             pattern_key=primary_pattern_key,
-            code=req.code
-        )
-    print(f"   ✓ Solution generated")
+            code=req.code,
+            error=req.message
+        ))
     
-    # Step 4: External Knowledge Search
-    print("[4/7] 🌐 Searching external knowledge...")
-    search_query = pattern_detector.map_pattern_to_search_query(primary_pattern_key)
-    external_knowledge = knowledge_search.get_external_knowledge(search_query)
-    print(f"   ✓ Found {len(external_knowledge['github_repos'])} repos, "
-          f"{len(external_knowledge['stackoverflow_threads'])} SO threads, "
-          f"{len(external_knowledge['dev_articles'])} articles")
+    # Partial output of streamed steps, emitted between stage events
+    deltas: asyncio.Queue = asyncio.Queue()
     
-    # Step 5: Video Search with TRANSCRIPT-BASED TIMESTAMP EXTRACTION
-    print("[5/7] 🎥 Finding pattern-specific video segments with TRANSCRIPT ANALYSIS...")
-    video_query = f"{primary_pattern_name} tutorial solution"
-    raw_videos = await search_youtube(video_query)
+    async def explanation_step():
+        # Step 2: Pattern Explanation
+        if combined is not None:
+            pattern_explanation = (await combined)[0]
+        else:
+            # Stream the explanation so clients can render it as it's written
+            chunks = []
+            async for chunk in pattern_detector.stream_pattern_explanation(
+                pattern_key=primary_pattern_key,
+                code=req.code,
+                error=req.message
+            ):
+                chunks.append(chunk)
+                deltas.put_nowait(("explanation_delta", {"delta": chunk}))
+            pattern_explanation = "".join(chunks).strip()
+        print(f"   ✓ Explanation generated")
+        return {
+            "primary_pattern_explanation": pattern_explanation,
+            "pattern_explanation": pattern_explanation,
+            "explanation": f"**PRIMARY PATTERN:** {primary_pattern_name}\n\n{pattern_explanation}",
+        }
     
-    video_segments = []
-    video_skip_reasons = []
-    pattern_keywords = pattern_detector.get_pattern_keywords(primary_pattern_key)
+    async def solution_step():
+        # Step 3: Generate Solution
+        corrected_code = None
+        if combined is not None:
+            corrected_code = (await combined)[1]
+        print(f"   ✓ Solution generated")
+        return {"corrected_code": corrected_code}
+    
+    async def knowledge_step():
+        # Step 4: External Knowledge Search
+        external_knowledge = await asyncio.to_thread(knowledge_search.get_external_knowledge, search_query)
+        print(f"   ✓ Found {len(external_knowledge['github_repos'])} repos, "
+              f"{len(external_knowledge['stackoverflow_threads'])} SO threads, "
+              f"{len(external_knowledge['dev_articles'])} articles")
+        return {
+            "github_repos": external_knowledge["github_repos"],
+            "stackoverflow_links": external_knowledge["stackoverflow_threads"],
+            "dev_articles": external_knowledge["dev_articles"],
+        }
     
-    for vid in raw_videos[:3]:  # Limit to top 3
-        video_url = vid.get("url", "")
-        video_title = vid.get("title", "Video")
-        
-        # Check if transcript/audio available
-        has_transcript, skip_reason = video_transcript_analyzer.check_audio_availability(video_url)
-        
-        # Try to extract timestamps if transcript is available
-        timestamps = None
-        if has_transcript:
-            try:
-                timestamps = video_transcript_analyzer.extract_solution_timestamps(
-                    video_url=video_url,
-                    pattern_name=primary_pattern_name,
-                    pattern_keywords=pattern_keywords
-                )
-            except Exception as e:
-                logger.warning(f"Failed to extract timestamps from {video_url}: {e}")
-                has_transcript = False
-                skip_reason = f"Timestamp extraction failed: {str(e)[:50]}"
-        
-        # Extract video ID for embedding
-        video_id = video_transcript_analyzer.extract_video_id(video_url)
-        
-        # Add video even if transcript is not available (but note it)
-        if timestamps:
-            # Video with timestamps - full featured
-            video_segments.append(VideoSegment(
-                title=video_title,
-                url=video_url,
-                video_id=video_id,
-                thumbnail=vid.get("thumbnail"),
-                channel=vid.get("channel"),
-                start_time=timestamps["start_formatted"],
-                end_time=timestamps["end_formatted"],
-                relevance_note=f"Covers {primary_pattern_name} solution ({timestamps['confidence']} confidence)",
-                transcript_text=timestamps.get("transcript_text", ""),
-                highlighted_portion=timestamps.get("highlighted_portion", "")
-            ))
-            print(f"   ✓ Extracted: [{timestamps['start_formatted']} - {timestamps['end_formatted']}]")
-        elif has_transcript:
-            # Video has transcript but pattern not found - still show it
-            video_segments.append(VideoSegment(
-                title=video_title,
-                url=video_url,
-                video_id=video_id,
-                thumbnail=vid.get("thumbnail"),
-                channel=vid.get("channel"),
-                start_time=None,
-                end_time=None,
-                relevance_note=f"Video about {primary_pattern_name} (no specific timestamps found)",
-                transcript_text="",
-                highlighted_portion=""
-            ))
-            print(f"   ✓ Added video (no timestamps found)")
-        else:
-            # No transcript - still show video but note it
-            video_segments.append(VideoSegment(
-                title=video_title,
-                url=video_url,
-                video_id=video_id,
-                thumbnail=vid.get("thumbnail"),
-                channel=vid.get("channel"),
-                start_time=None,
-                end_time=None,
-                relevance_note=f"Video about {primary_pattern_name} (transcript unavailable - watch full video)",
-                transcript_text="",
-                highlighted_portion=""
-            ))
-            video_skip_reasons.append(f"{video_title[:50]}... - {skip_reason}")
-            print(f"   ⚠️  Added video without transcript: {skip_reason}")
+    async def video_step():
+        # Step 5: Video Search with TRANSCRIPT-BASED TIMESTAMP EXTRACTION
+        raw_videos, video_segments, video_skip_reasons = await find_pattern_video_segments(
+            primary_pattern_key, primary_pattern_name
+        )
+        return {
+            "video_segments": video_segments,  # REAL timestamps from transcripts
+            "video_skip_reasons": video_skip_reasons,  # TRANSPARENCY
+            "youtube_videos": raw_videos,
+        }
     
-    print(f"   ✓ Processed {len(video_segments)} videos, skipped {len(video_skip_reasons)}")
+    async def debug_step():
+        # Step 6: Debugging Insights
+        debugging_insight = await asyncio.to_thread(
+            debug_analyzer.generate_debug_insight,
+            pattern_name=primary_pattern_name,
+            code=req.code,
+            error_message=req.message,
+            user_message=req.message
+        )
+        print(f"   ✓ Debugging insight generated")
+        return {
+            "debugging_insight": debugging_insight,
+            "error_analysis": debugging_insight.get("root_cause", None),
+        }
     
-    # Step 6: Debugging Insights
-    print("[6/7] 🐛 Generating debugging insights...")
-    debugging_insight = debug_analyzer.generate_debug_insight(
-        pattern_name=primary_pattern_name,
-        code=req.code,
-        error_message=req.message,
-        user_message=req.message
-    )
-    print(f"   ✓ Debugging insight generated")
+    steps = {
+        asyncio.ensure_future(explanation_step()): "explanation",
+        asyncio.ensure_future(solution_step()): "solution",
+        asyncio.ensure_future(knowledge_step()): "knowledge",
+        asyncio.ensure_future(video_step()): "videos",
+        asyncio.ensure_future(debug_step()): "debugging_insight",
+    }
+    pending = set(steps)
+    next_delta = asyncio.ensure_future(deltas.get())
+    try:
+        # Emit partial output as it arrives and each step as soon as it finishes
+        while pending:
+            done, _ = await asyncio.wait(pending | {next_delta}, return_when=asyncio.FIRST_COMPLETED)
+            if next_delta in done:
+                yield next_delta.result()
+                next_delta = asyncio.ensure_future(deltas.get())
+            # A step's remaining partial output always precedes its stage event
+            while not deltas.empty():
+                yield deltas.get_nowait()
+            for task in done & pending:
+                pending.discard(task)
+                fields = task.result()
+                response_fields.update(fields)
+                yield steps[task], fields
+    finally:
+        # Client went away or a step failed - don't leave the others running
+        next_delta.cancel()
+        for task in pending:
+            task.cancel()
+        if combined is not None:
+            combined.cancel()
     
     # Step 7: Assemble Response
     print("[7/7] 📦 Assembling comprehensive response...")
@@ -2090,55 +2258,86 @@ async def chat(req: ChatRequest, user=Depends(auth.get_current_user)):
     print(f"✅ ENHANCED PATTERN INTELLIGENCE RESPONSE READY")
     print(f"{'='*60}\n")
     
-    return ChatResponse(
-        # PRIMARY Pattern (ALWAYS FIRST - Rule Enforced)
-        primary_pattern=primary_pattern_name,
-        primary_pattern_explanation=pattern_explanation,
-        
-        # Secondary Issues (syntax, types, etc.)
-        secondary_issues=secondary_issues,
-        
-        # Pattern Intelligence (Legacy compatibility)
-        pattern_name=primary_pattern_name,
-        pattern_explanation=pattern_explanation,
-        confidence_score=confidence,
-        learning_intent=learning_intent,
-        
-        # Solutions
-        explanation=f"**PRIMARY PATTERN:** {primary_pattern_name}\n\n{pattern_explanation}",
-        corrected_code=corrected_code,
-        
-        # External Knowledge
-        github_repos=external_knowledge["github_repos"],
-        stackoverflow_links=external_knowledge["stackoverflow_threads"],
-        dev_articles=external_knowledge["dev_articles"],
-        
-        # Video Segments (with REAL timestamps from transcripts)
-        video_segments=video_segments,
-        video_skip_reasons=video_skip_reasons,  # TRANSPARENCY
-        
-        # Debugging Insights
-        debugging_insight=debugging_insight,
-        
-        # Legacy fields (for backward compatibility)
-        links=[],
-        youtube_videos=raw_videos,
-        error_analysis=debugging_insight.get("root_cause", None)
+    # Legacy `links` field kept for backward compatibility
+    yield "complete", ChatResponse(**response_fields, links=[])
+
+@app.post("/api/chat", response_model=ChatResponse)
+async def chat(req: ChatRequest, user=Depends(auth.get_current_user)):
+    """
+    ENHANCED Pattern Intelligence Layer - Chat endpoint
+    PRIMARY PATTERN FIRST - MANDATORY RULE ENFORCEMENT
+    
+    If use_advanced_analysis is True, uses advanced deterministic analysis
+    """
+    async for stage, result in chat_pipeline_events(req, user):
+        if stage == "complete":
+            return result
+
+@app.post("/api/chat/stream")
+async def chat_stream(req: ChatRequest, user=Depends(auth.get_current_user)):
+    """
+    Streaming variant of /api/chat (Server-Sent Events).
+    
+    Emits one event per pipeline stage as soon as it finishes (primary_pattern,
+    explanation, solution, knowledge, videos, debugging_insight), each carrying
+    the ChatResponse fields it produced, then a final `complete` event with the
+    full ChatResponse. Streamed text arrives first as `explanation_delta`
+    events ({"delta": "..."}). Failures are reported as an `error` event.
+    """
+    async def event_stream():
+        try:
+            async for stage, result in chat_pipeline_events(req, user):
+                yield f"event: {stage}\ndata: {json.dumps(jsonable_encoder(result))}\n\n"
+        except Exception as e:
+            logger.error(f"Chat stream error: {e}", exc_info=True)
+            yield f"event: error\ndata: {json.dumps({'detail': 'Chat pipeline failed'})}\n\n"
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
 
 # ---------------- FRONTEND ----------------
+# Vite emits build assets as assets/<name>-<content hash>.<ext>; their URL changes
+# whenever their content does, so browsers may cache them forever
+_HASHED_ASSET_RE = re.compile(r"(^|/)assets/[^/]+-[A-Za-z0-9_-]{8,}\.\w+$")
+
+class CachedStaticFiles(StaticFiles):
+    """StaticFiles that marks content-hashed build assets as immutable"""
+    async def get_response(self, path: str, scope):
+        response = await super().get_response(path, scope)
+        if response.status_code == 200 and _HASHED_ASSET_RE.search(path):
+            response.headers["Cache-Control"] = "public, max-age=31536000, immutable"
+        return response
+
+def _load_favicon():
+    """Read the frontend's icon once so /favicon.ico never touches disk or the network"""
+    for name, media_type in (("favicon.ico", "image/x-icon"), ("vite.svg", "image/svg+xml")):
+        path = os.path.join(DIST_DIR, name)
+        if os.path.isfile(path):
+            with open(path, "rb") as f:
+                return f.read(), media_type
+    return None
+
+_favicon = _load_favicon()
+
+# Registered before the "/" mount below, which would otherwise shadow it
+@app.get("/favicon.ico")
+async def favicon():
+    if _favicon is None:
+        return Response(status_code=204)
+    content, media_type = _favicon
+    return Response(content=content, media_type=media_type, headers={"Cache-Control": "public, max-age=86400"})
+
 if os.path.exists(DIST_DIR):
     print(f"[OK] dist_build found at {DIST_DIR}")
     print("Files:", os.listdir(DIST_DIR))
-    app.mount("/", StaticFiles(directory=DIST_DIR, html=True), name="frontend")
+    app.mount("/", CachedStaticFiles(directory=DIST_DIR, html=True, check_dir=False), name="frontend")
 else:
     print(f"[WARNING] dist_build not found at {DIST_DIR}")
     print("Contents of backend:", os.listdir(BASE_DIR))
 
-@app.get("/favicon.ico")
-async def favicon():
-    return RedirectResponse("https://www.google.com/favicon.ico")
-
 # ---------------- CODE PATTERN & ALGORITHM ANALYSIS ----------------
 async def analyze_code_pattern_and_algorithm(code_snippet: str) -> Dict:
     """
@@ -2160,10 +2359,10 @@ Guidelines:
 - Analyze only the code provided around the cursor.
 - Ignore unrelated code, imports, or UI elements.
 - Return results as a JSON object:
-  {
+  {{
     "pattern": "<pattern_name_or_Unknown>",
     "algorithm": "<algorithm_name_or_Unknown>"
-  }
+  }}
 - If you cannot confidently identify a design pattern or algorithm, return "Unknown" for that field.
 - Focus on behavior and structure, not just variable or function names.
 
@@ -2175,30 +2374,21 @@ Guidelines:
 **Your Analysis (JSON only):**""".format(code=code_snippet)
 
     try:
-        response = await get_gpt4o_response(prompt, temperature=0.3)
+        # JSON mode guarantees a bare JSON object, so no need to hunt for braces
+        response = await get_gpt4o_response(prompt, temperature=0.3, response_format={"type": "json_object"})
         
         if not response:
             return {"pattern": "Unknown", "algorithm": "Unknown"}
         
-        # Try to parse JSON from response
-        # Extract JSON from response (handle cases where GPT adds extra text)
-        response_clean = response.strip()
-        
-        # Try to find JSON object in response
-        json_start = response_clean.find('{')
-        json_end = response_clean.rfind('}') + 1
-        
-        if json_start >= 0 and json_end > json_start:
-            json_str = response_clean[json_start:json_end]
-            try:
-                result = json.loads(json_str)
-                # Ensure both fields exist
-                return {
-                    "pattern": result.get("pattern", "Unknown"),
-                    "algorithm": result.get("algorithm", "Unknown")
-                }
-            except json.JSONDecodeError:
-                logger.warning(f"Failed to parse JSON from GPT response: {json_str}")
+        try:
+            result = json.loads(response)
+            # Ensure both fields exist
+            return {
+                "pattern": result.get("pattern", "Unknown"),
+                "algorithm": result.get("algorithm", "Unknown")
+            }
+        except (json.JSONDecodeError, AttributeError):
+            logger.warning(f"Failed to parse JSON from GPT response: {response}")
         
         # Fallback: return Unknown if parsing fails
         return {"pattern": "Unknown", "algorithm": "Unknown"}
@@ -3,11 +3,51 @@ Pattern Detection Module for Code Intelligence Layer
 Identifies coding problem patterns from code snippets and error messages
 """
 
-from typing import Dict, List, Optional, Tuple
-from openai import OpenAI
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import sys
+from collections import defaultdict
+from threading import Lock
+from types import MappingProxyType
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+import numpy as np
+from openai import AsyncOpenAI
 from config import OPENAI_API_KEY
+from cache_utils import SemanticCache, TTLCache
+from keyword_matcher import KeywordAutomaton
+from embeddings import embed_texts
 
-OPENAI_CLIENT = OpenAI(api_key=OPENAI_API_KEY)
+logger = logging.getLogger(__name__)
+
+OPENAI_CLIENT = AsyncOpenAI(api_key=OPENAI_API_KEY)
+
+# Exact-match LRU caches for GPT results, so resubmitted code/error pairs skip the API
+_DETECT_CACHE = TTLCache(maxsize=1024)
+_EXPLANATION_CACHE = TTLCache(maxsize=1024)
+_SOLUTION_CACHE = TTLCache(maxsize=1024)
+
+# GPT detections keyed by context embedding: a near-duplicate request (cosine
+# >= 0.92) reuses the earlier answer instead of another GPT call for a day
+_SEMANTIC_DETECT_CACHE = SemanticCache(maxsize=2048, threshold=0.92, ttl=24 * 3600)
+
+# Embedding classifier: cosine similarity against one embedding per pattern.
+# Below the threshold the request is ambiguous and goes to GPT instead.
+EMBEDDING_MIN_SIMILARITY = 0.35
+
+# Detection runs on the small model first and escalates to the large one when
+# the returned confidence is below the gate
+DETECTION_MODEL = "gpt-4o-mini"
+DETECTION_ESCALATION_MODEL = "gpt-4o"
+DETECTION_ESCALATION_CONFIDENCE = 70
+
+# Keyword short-circuit: skip the embedding and GPT calls when the best
+# keyword score is high and at least double the runner-up's
+KEYWORD_SHORT_CIRCUIT_MIN_SCORE = 10
+KEYWORD_SHORT_CIRCUIT_MARGIN = 2
+KEYWORD_SHORT_CIRCUIT_CONFIDENCE = 85.0
 
 # Pattern Library - Database of known coding patterns
 PATTERN_LIBRARY = {
@@ -223,20 +263,173 @@ PATTERN_LIBRARY = {
     }
 }
 
+# The library is static after import: freeze it (read-only views, interned keys)
+# so nothing can drift out of sync with the precomputed tables below
+PATTERN_LIBRARY = MappingProxyType({
+    sys.intern(key): MappingProxyType(info) for key, info in PATTERN_LIBRARY.items()
+})
+
+# Struct-of-arrays view of PATTERN_LIBRARY, built once at import. Row i of every
+# tuple describes pattern _PATTERN_KEYS[i]; _PATTERN_INDEX maps key -> row.
+_PATTERN_KEYS: Tuple[str, ...] = tuple(PATTERN_LIBRARY)
+_PATTERN_INDEX: Dict[str, int] = {key: i for i, key in enumerate(_PATTERN_KEYS)}
+_PATTERN_NAMES: Tuple[str, ...] = tuple(
+    info.get("name", "Unknown Pattern") for info in PATTERN_LIBRARY.values()
+)
+_PATTERN_TYPES: Tuple[Optional[str], ...] = tuple(
+    info.get("pattern_type") for info in PATTERN_LIBRARY.values()
+)
+_PATTERN_KEYWORDS: Tuple[Tuple[str, ...], ...] = tuple(
+    tuple(info.get('keywords', [])) for info in PATTERN_LIBRARY.values()
+)
+_PATTERN_KEYWORDS_LOWER: Tuple[Tuple[str, ...], ...] = tuple(
+    tuple(keyword.lower() for keyword in keywords) for keywords in _PATTERN_KEYWORDS
+)
+_PATTERN_ERRORS_LOWER: Tuple[Tuple[str, ...], ...] = tuple(
+    tuple(error.lower() for error in info.get('common_errors', [])) for info in PATTERN_LIBRARY.values()
+)
+_PATTERN_LEARNING_INTENTS: Tuple[str, ...] = tuple(
+    info.get("learning_intent", "Understanding best practices and avoiding common pitfalls")
+    for info in PATTERN_LIBRARY.values()
+)
+# Pattern name plus top 3 keywords, for external knowledge search
+_PATTERN_SEARCH_QUERIES: Tuple[str, ...] = tuple(
+    " ".join([info.get("name", "")] + list(info.get("keywords", [])[:3]))
+    for info in PATTERN_LIBRARY.values()
+)
+
+# Detection instructions, sent as a static system message so every request
+# shares the same prefix (OpenAI prompt caching) and only the context varies.
+# Pattern keys are self-describing, and the response schema enforces them.
+PATTERN_KEYS_CSV = ", ".join(_PATTERN_KEYS)
+_DETECT_SYSTEM_PROMPT = (
+    "Classify the coding problem in the user's input (description, error and/or code) "
+    f"into exactly one pattern key: {PATTERN_KEYS_CSV}. "
+    "Be specific: name the algorithm (e.g. bubble_sort, not sorting_algorithm_issue), "
+    "design pattern or error category, e.g. ECONNREFUSED -> server_down_error, "
+    "getInstance() with a private constructor -> singleton_pattern. "
+    'Reply as JSON {"pattern_key": key, "confidence": 0-100}.'
+)
+
+# Structured output for detection: the server only lets the model answer with
+# a known pattern key, so the reply never needs validating or re-parsing
+_DETECT_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "pattern_detection",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "pattern_key": {"type": "string", "enum": list(_PATTERN_KEYS)},
+                "confidence": {"type": "number"}
+            },
+            "required": ["pattern_key", "confidence"],
+            "additionalProperties": False
+        }
+    }
+}
+
+# Markers for the secondary-issue checks, found in a single scan of the lowercased input
+_SECONDARY_ISSUE_RE = re.compile(r"=|comparison|assignment|type")
+
+# Pattern keys split by pattern_type (patterns without a type are in neither)
+_PRIMARY_KEYS: Tuple[str, ...] = tuple(
+    key for key, pattern_type in zip(_PATTERN_KEYS, _PATTERN_TYPES) if pattern_type == "PRIMARY"
+)
+_SECONDARY_KEYS: frozenset = frozenset(
+    key for key, pattern_type in zip(_PATTERN_KEYS, _PATTERN_TYPES) if pattern_type == "SECONDARY"
+)
+
+# Inverted index over PRIMARY patterns only: lowercased keyword -> indices of
+# the patterns listing it (repeated if a pattern lists the keyword more than once)
+_PRIMARY_KEYWORD_INDEX: Dict[str, List[int]] = defaultdict(list)
+for _key in _PRIMARY_KEYS:
+    _i = _PATTERN_INDEX[_key]
+    for _keyword in _PATTERN_KEYWORDS_LOWER[_i]:
+        _PRIMARY_KEYWORD_INDEX[_keyword].append(_i)
+_PRIMARY_KEYWORD_INDEX = dict(_PRIMARY_KEYWORD_INDEX)
+
+# Single Aho-Corasick automaton over every lowercased keyword and error, so the
+# fallback counts all terms in one pass over the text
+_FALLBACK_MATCHER = KeywordAutomaton(
+    term for terms in _PATTERN_KEYWORDS_LOWER + _PATTERN_ERRORS_LOWER for term in terms
+)
 
-def detect_pattern(code: Optional[str], error_message: str, user_message: str) -> Tuple[str, float]:
+# Fallback weights as (patterns x terms) matrices over the automaton's term order:
+# keywords score 2 per occurrence, common errors score 5 once if present
+_FALLBACK_KEYWORD_WEIGHTS = np.zeros((len(_PATTERN_KEYS), len(_FALLBACK_MATCHER.keywords)), dtype=np.int64)
+_FALLBACK_ERROR_WEIGHTS = np.zeros_like(_FALLBACK_KEYWORD_WEIGHTS)
+_term_index = {term: j for j, term in enumerate(_FALLBACK_MATCHER.keywords)}
+for _i in range(len(_PATTERN_KEYS)):
+    for _keyword in _PATTERN_KEYWORDS_LOWER[_i]:
+        _FALLBACK_KEYWORD_WEIGHTS[_i, _term_index[_keyword]] += 2
+    for _error in _PATTERN_ERRORS_LOWER[_i]:
+        _FALLBACK_ERROR_WEIGHTS[_i, _term_index[_error]] += 5
+del _term_index
+
+# Unit-normalized pattern embeddings, built on first use. Kept in float32: the
+# matrix is one row per pattern (~150 KB), so int8 would save little and cost
+# an int8 -> float32 upcast on every classification.
+_pattern_embeddings: Optional[np.ndarray] = None
+_pattern_embeddings_lock = Lock()
+
+
+def _cache_key(*parts: Optional[str]) -> str:
+    """Build a compact cache key from the (stripped) request inputs"""
+    joined = "\x00".join((part or "").strip() for part in parts)
+    return hashlib.sha1(joined.encode("utf-8")).hexdigest()
+
+
+def _get_pattern_embeddings() -> np.ndarray:
+    """Embed every pattern's name, description and keywords once per process"""
+    global _pattern_embeddings
+    if _pattern_embeddings is None:
+        with _pattern_embeddings_lock:
+            if _pattern_embeddings is None:
+                profiles = [
+                    f"{info['name']}: {info['description']} {' '.join(info['keywords'])}"
+                    for info in PATTERN_LIBRARY.values()
+                ]
+                _pattern_embeddings = embed_texts(profiles)
+    return _pattern_embeddings
+
+
+def _embed_context(context: str) -> Optional[np.ndarray]:
+    """Embed the request context, or None if the embeddings API is unavailable"""
+    try:
+        return embed_texts([context])[0]
+    except Exception as e:
+        logger.warning("Context embedding error: %s", e)
+        return None
+
+
+def _embedding_pattern_detection(query: np.ndarray) -> Optional[Tuple[str, float]]:
     """
-    Detect the coding problem pattern from code and error message.
+    Classify an embedded context by cosine similarity to the pattern embeddings.
     
     Args:
-        code: Optional code snippet
-        error_message: Error message or problem description
-        user_message: User's description of the problem
+        query: Unit-length embedding of the combined user description, error and code
     
     Returns:
-        Tuple of (pattern_key, confidence_score)
+        Tuple of (pattern_key, confidence_score), or None if no pattern is
+        similar enough or the pattern embeddings are unavailable
     """
-    # Build context for GPT-4o
+    try:
+        pattern_embeddings = _get_pattern_embeddings()
+    except Exception as e:
+        logger.warning("Embedding pattern detection error: %s", e)
+        return None
+    
+    similarities = pattern_embeddings @ query
+    best = int(similarities.argmax())
+    if similarities[best] < EMBEDDING_MIN_SIMILARITY:
+        return None
+    return _PATTERN_KEYS[best], round(float(similarities[best]) * 100, 1)
+
+
+def _detection_context(code: Optional[str], error_message: str, user_message: str) -> str:
+    """Combine the request inputs into the labelled context used for detection"""
     context_parts = []
     if user_message:
         context_parts.append(f"User Description: {user_message}")
@@ -245,70 +438,291 @@ def detect_pattern(code: Optional[str], error_message: str, user_message: str) -
     if code:
         context_parts.append(f"Code:\n{code}")
     
-    context = "\n\n".join(context_parts)
-    
-    # Pattern detection prompt
-    pattern_names = "\n".join([f"- {key}: {info['name']}" for key, info in PATTERN_LIBRARY.items()])
-    
-    prompt = f"""You are a Code Pattern Intelligence System for a Final Year Project.
+    return "\n\n".join(context_parts)
 
-Your task is to identify the SPECIFIC CATEGORY of coding problem from the code and error message.
 
-**Available Patterns:**
-{pattern_names}
+def _embedding_stage(query: np.ndarray) -> Optional[Tuple[str, float]]:
+    """Embedding classifier, then the semantic cache of earlier GPT answers"""
+    detected = _embedding_pattern_detection(query)
+    if detected is None:
+        # Near-duplicate of a request GPT already classified
+        similar = _SEMANTIC_DETECT_CACHE.get(query)
+        if similar is not None:
+            detected = (similar[0], max(similar[1] - 5, 0))
+    return detected
 
-**Input:**
-{context}
 
-**Instructions:**
-1. Analyze the code to identify the SPECIFIC algorithm type, design pattern, or error category
-   - If sorting: identify if it's bubble_sort, quick_sort, merge_sort, or insertion_sort
-   - If design pattern: identify singleton_pattern, factory_pattern, observer_pattern, adapter_pattern, or strategy_pattern
-   - If server error: identify server_down_error
-   - Be SPECIFIC, not generic
-2. Return ONLY the exact pattern key from the list above (e.g., "bubble_sort" not "sorting_algorithm_issue")
-3. On the next line, return a confidence score (0-100)
-4. Format your response as:
-   pattern_key
-   confidence_score
+async def _gpt_pattern_detection(
+    context: str,
+    context_lower: str,
+    query: Optional[np.ndarray],
+    cache_key: str
+) -> Tuple[str, float]:
+    """Ask the detection models for the pattern, falling back to keyword matching"""
+    messages = [
+        {"role": "system", "content": _DETECT_SYSTEM_PROMPT},
+        {"role": "user", "content": context}
+    ]
+    
+    # gpt-4o-mini handles clear-cut inputs; escalate to gpt-4o only when it is unsure
+    answer = None
+    for model in (DETECTION_MODEL, DETECTION_ESCALATION_MODEL):
+        try:
+            response = await OPENAI_CLIENT.chat.completions.create(
+                model=model,
+                messages=messages,
+                max_tokens=32,  # Answer is just {"pattern_key": ..., "confidence": ...}
+                temperature=0,  # Classification over a closed label set - keep it deterministic
+                response_format=_DETECT_RESPONSE_FORMAT
+            )
+        except Exception as e:
+            logger.warning("Pattern detection error (%s): %s", model, e)
+            continue  # API failure - the other model may still answer
+        
+        try:
+            result = json.loads(response.choices[0].message.content)
+            pattern_key, confidence = result["pattern_key"], float(result["confidence"])
+            if pattern_key not in PATTERN_LIBRARY:
+                raise ValueError(f"unknown pattern key {pattern_key!r}")
+        except (ValueError, KeyError, TypeError) as e:
+            # Malformed output: another model call rarely fixes it, the keyword scorer is free
+            logger.warning("Malformed pattern detection reply (%s): %s", model, e)
+            break
+        
+        answer = (pattern_key, confidence)
+        if confidence >= DETECTION_ESCALATION_CONFIDENCE:
+            break
+    
+    if answer is None:
+        # Fallback to keyword-based detection
+        return _fallback_pattern_detection(context_lower), 60.0
+    
+    if query is not None:
+        _SEMANTIC_DETECT_CACHE.set(query, answer)
+    _DETECT_CACHE.set(cache_key, answer)
+    return answer
+
 
-**Examples:**
-If code shows nested loops comparing adjacent elements and swapping → "bubble_sort"
-If error shows "ECONNREFUSED" or "Server unreachable" → "server_down_error"
-If code uses getInstance() with private constructor → "singleton_pattern"
+async def detect_pattern(code: Optional[str], error_message: str, user_message: str) -> Tuple[str, float]:
+    """
+    Detect the coding problem pattern from code and error message.
+    
+    Args:
+        code: Optional code snippet
+        error_message: Error message or problem description
+        user_message: User's description of the problem
+    
+    Returns:
+        Tuple of (pattern_key, confidence_score)
+    """
+    # Nothing to classify - don't spend an embedding or GPT call on an empty prompt
+    if not (code or "").strip() and not (error_message or "").strip() and not (user_message or "").strip():
+        return "error_handling_blind_spot", 40.0
+    
+    cache_key = _cache_key(code, error_message, user_message)
+    cached = _DETECT_CACHE.get(cache_key)
+    if cached is not None:
+        return cached
+    
+    context = _detection_context(code, error_message, user_message)
+    context_lower = context.lower()
+    
+    # Unambiguous keyword evidence (e.g. "ECONNREFUSED", "bubble sort") needs no model at all
+    decisive = _keyword_short_circuit(_fallback_scores(context_lower))
+    if decisive is not None:
+        _DETECT_CACHE.set(cache_key, (decisive, KEYWORD_SHORT_CIRCUIT_CONFIDENCE))
+        return decisive, KEYWORD_SHORT_CIRCUIT_CONFIDENCE
+    
+    # Cheap embedding classifier first; GPT only for ambiguous inputs
+    query = await asyncio.to_thread(_embed_context, context) if context else None
+    if query is not None:
+        detected = await asyncio.to_thread(_embedding_stage, query)
+        if detected is not None:
+            _DETECT_CACHE.set(cache_key, detected)
+            return detected
+    
+    return await _gpt_pattern_detection(context, context_lower, query, cache_key)
 
-**Your Response:**"""
 
-    try:
-        response = OPENAI_CLIENT.chat.completions.create(
-            model="gpt-4o",
-            messages=[{"role": "user", "content": prompt}],
-            max_tokens=100,
-            temperature=0.3  # Lower temperature for more consistent pattern detection
-        )
-        
-        result = response.choices[0].message.content.strip().split('\n')
-        pattern_key = result[0].strip()
-        confidence = float(result[1].strip()) if len(result) > 1 else 70.0
-        
-        # Validate pattern key
-        if pattern_key not in PATTERN_LIBRARY:
-            # Fallback to keyword matching
-            pattern_key = _fallback_pattern_detection(context.lower())
-            confidence = max(confidence - 20, 50)
+async def detect_patterns_batch(
+    items: List[Tuple[Optional[str], str, str]]
+) -> List[Tuple[str, float]]:
+    """
+    Detect patterns for many requests at once.
+    
+    Same pipeline as detect_pattern(), but all contexts that get past the
+    keyword short-circuit are embedded in one API request, and the remaining
+    ambiguous ones go to GPT concurrently. Duplicate inputs are detected once.
+    
+    Args:
+        items: (code, error_message, user_message) tuples
+    
+    Returns:
+        (pattern_key, confidence_score) tuples, in input order
+    """
+    results: List[Optional[Tuple[str, float]]] = [None] * len(items)
+    pending: Dict[str, List[int]] = {}  # cache key -> indices of items awaiting a model
+    contexts: Dict[str, Tuple[str, str]] = {}  # cache key -> (context, context_lower)
+    
+    for i, (code, error_message, user_message) in enumerate(items):
+        if not (code or "").strip() and not (error_message or "").strip() and not (user_message or "").strip():
+            results[i] = ("error_handling_blind_spot", 40.0)
+            continue
         
-        return pattern_key, confidence
+        cache_key = _cache_key(code, error_message, user_message)
+        cached = _DETECT_CACHE.get(cache_key)
+        if cached is not None:
+            results[i] = cached
+            continue
         
+        if cache_key not in pending:
+            context = _detection_context(code, error_message, user_message)
+            context_lower = context.lower()
+            decisive = _keyword_short_circuit(_fallback_scores(context_lower))
+            if decisive is not None:
+                _DETECT_CACHE.set(cache_key, (decisive, KEYWORD_SHORT_CIRCUIT_CONFIDENCE))
+                results[i] = (decisive, KEYWORD_SHORT_CIRCUIT_CONFIDENCE)
+                continue
+            contexts[cache_key] = (context, context_lower)
+        pending.setdefault(cache_key, []).append(i)
+    
+    if not pending:
+        return results
+    
+    # One embeddings request for every remaining context
+    keys = list(pending)
+    try:
+        vectors = await asyncio.to_thread(embed_texts, [contexts[key][0] for key in keys])
     except Exception as e:
-        print(f"Pattern detection error: {e}")
-        # Fallback to keyword-based detection
-        pattern_key = _fallback_pattern_detection((context or "").lower())
-        return pattern_key, 60.0
+        logger.warning("Context embedding error: %s", e)
+        vectors = [None] * len(keys)
+    
+    queries = dict(zip(keys, vectors))
+    detected = await asyncio.to_thread(
+        lambda: {key: _embedding_stage(query) for key, query in queries.items() if query is not None}
+    )
+    
+    misses = [key for key in keys if detected.get(key) is None]
+    for key in keys:
+        if detected.get(key) is not None:
+            _DETECT_CACHE.set(key, detected[key])
+    
+    # Ambiguous inputs go to GPT concurrently
+    answers = await asyncio.gather(*(
+        _gpt_pattern_detection(*contexts[key], queries[key], key) for key in misses
+    ))
+    detected.update(zip(misses, answers))
+    
+    for key, indices in pending.items():
+        for i in indices:
+            results[i] = detected[key]
+    return results
 
 
+async def _run_detection_batch(model: str, contexts: Dict[str, str], poll_interval: float) -> Dict[str, Tuple[str, float]]:
+    """
+    Classify contexts through the OpenAI Batch API and wait for the results.
+    
+    Args:
+        model: Chat model for every request in the batch
+        contexts: custom_id -> detection context
+        poll_interval: Seconds between batch status checks
+    
+    Returns:
+        custom_id -> (pattern_key, confidence) for every request that succeeded
+    """
+    lines = [
+        json.dumps({
+            "custom_id": custom_id,
+            "method": "POST",
+            "url": "/v1/chat/completions",
+            "body": {
+                "model": model,
+                "messages": [
+                    {"role": "system", "content": _DETECT_SYSTEM_PROMPT},
+                    {"role": "user", "content": context}
+                ],
+                "max_tokens": 32,
+                "temperature": 0,
+                "response_format": _DETECT_RESPONSE_FORMAT
+            }
+        })
+        for custom_id, context in contexts.items()
+    ]
+    input_file = await OPENAI_CLIENT.files.create(
+        file=("pattern_detection.jsonl", "\n".join(lines).encode("utf-8")),
+        purpose="batch"
+    )
+    batch = await OPENAI_CLIENT.batches.create(
+        input_file_id=input_file.id,
+        endpoint="/v1/chat/completions",
+        completion_window="24h"
+    )
+    while batch.status not in ("completed", "failed", "expired", "cancelled"):
+        await asyncio.sleep(poll_interval)
+        batch = await OPENAI_CLIENT.batches.retrieve(batch.id)
+    
+    if not batch.output_file_id:
+        logger.warning("Detection batch %s ended as %s without output", batch.id, batch.status)
+        return {}
+    
+    answers = {}
+    output = await OPENAI_CLIENT.files.content(batch.output_file_id)
+    for line in output.text.splitlines():
+        try:
+            record = json.loads(line)
+            result = json.loads(record["response"]["body"]["choices"][0]["message"]["content"])
+            answers[record["custom_id"]] = (result["pattern_key"], float(result["confidence"]))
+        except Exception as e:
+            logger.warning("Unusable detection batch result: %s", e)
+    return answers
 
 
-def detect_primary_and_secondary_patterns(
+async def batch_detect_patterns(
+    items: List[Tuple[Optional[str], str, str]],
+    poll_interval: float = 30.0
+) -> List[Tuple[str, float]]:
+    """
+    Detect patterns for an offline job through the OpenAI Batch API.
+    
+    Half the price of live requests but results can take up to 24 hours, so
+    this is for evaluation and dataset labelling runs, never the chat path.
+    Mirrors the live model routing: one gpt-4o-mini batch, then a gpt-4o
+    batch for answers below the escalation confidence. Requests the batches
+    could not answer fall back to keyword matching.
+    
+    Args:
+        items: (code, error_message, user_message) tuples
+        poll_interval: Seconds between batch status checks
+    
+    Returns:
+        (pattern_key, confidence_score) tuples, in input order
+    """
+    results: List[Optional[Tuple[str, float]]] = [None] * len(items)
+    contexts: Dict[str, str] = {}
+    
+    for i, (code, error_message, user_message) in enumerate(items):
+        if not (code or "").strip() and not (error_message or "").strip() and not (user_message or "").strip():
+            results[i] = ("error_handling_blind_spot", 40.0)
+        else:
+            contexts[str(i)] = _detection_context(code, error_message, user_message)
+    
+    answers: Dict[str, Tuple[str, float]] = {}
+    if contexts:
+        answers = await _run_detection_batch(DETECTION_MODEL, contexts, poll_interval)
+        unsure = {
+            custom_id: context for custom_id, context in contexts.items()
+            if custom_id not in answers or answers[custom_id][1] < DETECTION_ESCALATION_CONFIDENCE
+        }
+        if unsure:
+            answers.update(await _run_detection_batch(DETECTION_ESCALATION_MODEL, unsure, poll_interval))
+    
+    for custom_id, context in contexts.items():
+        results[int(custom_id)] = answers.get(custom_id) or (_fallback_pattern_detection(context.lower()), 60.0)
+    return results
+
+
+async def detect_primary_and_secondary_patterns(
     code: Optional[str],
     error_message: str,
     user_message: str
@@ -326,32 +740,38 @@ def detect_primary_and_secondary_patterns(
         Dict with primary_pattern, secondary_issues, confidence
     """
     # First detect all patterns
-    primary_pattern_key, confidence = detect_pattern(code, error_message, user_message)
+    primary_pattern_key, confidence = await detect_pattern(code, error_message, user_message)
     
     # Check if detected pattern is PRIMARY or SECONDARY
-    pattern_info = PATTERN_LIBRARY.get(primary_pattern_key, {})
-    pattern_type = pattern_info.get("pattern_type", "PRIMARY")
+    pattern_type = "SECONDARY" if primary_pattern_key in _SECONDARY_KEYS else "PRIMARY"
+    
+    # Lowercase each input once; both passes below build on these
+    code_lower = (code or '').lower()
+    error_lower = error_message.lower()
     
     # If detected pattern is SECONDARY, try to find PRIMARY pattern
     if pattern_type == "SECONDARY":
         # Look for PRIMARY patterns in code/error
-        context = f"{user_message} {error_message} {code or ''}".lower()
+        context = f"{user_message.lower()} {error_lower} {code_lower}"
         
-        # Search for PRIMARY patterns
-        primary_candidates = []
-        for key, info in PATTERN_LIBRARY.items():
-            if info.get("pattern_type") == "PRIMARY":
-                score = 0
-                for keyword in info.get('keywords', []):
-                    if keyword.lower() in context:
-                        score += 1
-                if score > 0:
-                    primary_candidates.append((key, score))
+        # Score PRIMARY patterns by the distinct keywords present: one automaton
+        # pass finds them, the inverted index maps them back to their patterns
+        found = {_FALLBACK_MATCHER.keywords[index] for _, index in _FALLBACK_MATCHER.iter(context)}
+        scores = [0] * len(_PATTERN_KEYS)
+        for keyword in found:
+            for i in _PRIMARY_KEYWORD_INDEX.get(keyword, ()):
+                scores[i] += 1
+        
+        # Best-scoring PRIMARY pattern (first one wins ties)
+        best = max(range(len(scores)), key=scores.__getitem__) if scores else 0
+        best_key = _PATTERN_KEYS[best] if scores and scores[best] > 0 else None
         
         # If PRIMARY pattern found, use it and make original pattern SECONDARY
-        if primary_candidates:
-            primary_pattern_key = max(primary_candidates, key=lambda x: x[1])[0]
-            secondary_pattern = get_pattern_name(detect_pattern(code, error_message, user_message)[0])
+        if best_key is not None:
+            # The pattern detected above becomes the secondary issue - reuse it
+            # rather than classifying the same inputs a second time
+            secondary_pattern = get_pattern_name(primary_pattern_key)
+            primary_pattern_key = best_key
             return {
                 "primary_pattern": primary_pattern_key,
                 "primary_pattern_name": get_pattern_name(primary_pattern_key),
@@ -361,14 +781,22 @@ def detect_primary_and_secondary_patterns(
     
     # If PRIMARY pattern detected, check for SECONDARY issues
     secondary_issues = []
-    context_lower = f"{code or ''} {error_message}".lower()
+    context_lower = f"{code_lower} {error_lower}"
+    
+    # One regex scan collects every marker, split by where it occurred
+    error_start = len(code_lower) + 1
+    in_context, in_error = set(), set()
+    for match in _SECONDARY_ISSUE_RE.finditer(context_lower):
+        in_context.add(match.group())
+        if match.start() >= error_start:
+            in_error.add(match.group())
     
-    # Check for common secondary issues
-    if "===" in context_lower or "==" in context_lower or "=" in context_lower:
-        if "comparison" in error_message.lower() or "assignment" in context_lower:
+    # Check for common secondary issues ("=" also covers "==" and "===")
+    if "=" in in_context:
+        if "comparison" in in_error or "assignment" in in_context:
             secondary_issues.append("Assignment operator (=) used instead of comparison (==)")
     
-    if "type" in error_message.lower() and pattern_type != "SECONDARY":
+    if "type" in in_error and pattern_type != "SECONDARY":
         secondary_issues.append("Type coercion issue")
     
     return {
@@ -381,51 +809,71 @@ def detect_primary_and_secondary_patterns(
 
 def get_pattern_name(pattern_key: str) -> str:
     """Get pattern name from key"""
-    return PATTERN_LIBRARY.get(pattern_key, {}).get("name", "Unknown Pattern")
+    index = _PATTERN_INDEX.get(pattern_key)
+    return _PATTERN_NAMES[index] if index is not None else "Unknown Pattern"
+
+
+def _fallback_scores(text: str) -> np.ndarray:
+    """Keyword score of every pattern (keywords: 2 per occurrence, errors: 5 if present).
+
+    `text` must already be lowercased; callers lowercase once and pass it through.
+    """
+    counts = np.array(_FALLBACK_MATCHER.count_by_index(text), dtype=np.int64)
+    return _FALLBACK_KEYWORD_WEIGHTS @ counts + _FALLBACK_ERROR_WEIGHTS @ (counts > 0)
+
+
+def _keyword_short_circuit(scores: np.ndarray) -> Optional[str]:
+    """Pattern key when keyword evidence alone is decisive, else None"""
+    if len(scores) < 2:
+        return None
+    second, top = np.partition(scores, -2)[-2:]
+    if top >= KEYWORD_SHORT_CIRCUIT_MIN_SCORE and top >= KEYWORD_SHORT_CIRCUIT_MARGIN * second:
+        return _PATTERN_KEYS[int(scores.argmax())]
+    return None
 
 
 def _fallback_pattern_detection(text: str) -> str:
-    """Fallback keyword matching if GPT fails"""
-    scores = {}
-    for key, info in PATTERN_LIBRARY.items():
-        score = 0
-        for keyword in info['keywords']:
-            score += text.count(keyword.lower()) * 2
-        for error in info['common_errors']:
-            if error.lower() in text:
-                score += 5
-        scores[key] = score
+    """Fallback keyword matching if GPT fails.
+
+    `text` must already be lowercased; callers lowercase once and pass it through.
+    """
+    scores = _fallback_scores(text)
     
     # Return pattern with highest score, or generic error handling
-    if max(scores.values()) > 0:
-        return max(scores, key=scores.get)
+    best = int(scores.argmax())
+    if scores[best] > 0:
+        return _PATTERN_KEYS[best]
     return "error_handling_blind_spot"
 
 
-def generate_pattern_explanation(pattern_key: str, code: Optional[str], error: str) -> str:
+async def stream_pattern_explanation(pattern_key: str, code: Optional[str], error: str) -> AsyncIterator[str]:
     """
-    Generate explanation of why this pattern fails.
+    Stream the explanation of why this pattern fails as it is generated.
+    
+    The full text is cached once the stream completes; cached explanations
+    are yielded as a single chunk. If generation fails before any text
+    arrives, the pattern description is yielded instead.
     
     Args:
         pattern_key: Detected pattern key
         code: Optional code snippet
         error: Error message
     
-    Returns:
-        Detailed pattern explanation
+    Yields:
+        Chunks of the pattern explanation
     """
+    cache_key = _cache_key(pattern_key, code, error)
+    cached = _EXPLANATION_CACHE.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+    
     pattern_info = PATTERN_LIBRARY.get(pattern_key, {})
     pattern_name = pattern_info.get("name", "Unknown Pattern")
     
+    # Static instructions first, request-specific details last (prompt-cache friendly)
     prompt = f"""You are a Code Pattern Intelligence System.
 
-**Detected Pattern:** {pattern_name}
-**Pattern Description:** {pattern_info.get('description', '')}
-
-**Context:**
-Error: {error}
-{f"Code: {code}" if code else ""}
-
 **Task:** Explain WHY this pattern fails (not what the code does).
 
 Focus on:
@@ -435,40 +883,81 @@ Focus on:
 
 Keep it concise (3-4 sentences).
 
+**Detected Pattern:** {pattern_name}
+**Pattern Description:** {pattern_info.get('description', '')}
+
+**Context:**
+{f"Error: {error}" if error else ""}
+{f"Code: {code}" if code else ""}
+
 **Your Explanation:**"""
 
+    chunks = []
     try:
-        response = OPENAI_CLIENT.chat.completions.create(
+        stream = await OPENAI_CLIENT.chat.completions.create(
             model="gpt-4o",
             messages=[{"role": "user", "content": prompt}],
-            max_tokens=300,
-            temperature=0.5
+            max_tokens=180,  # 3-4 sentences
+            temperature=0.5,
+            stream=True
         )
-        return response.choices[0].message.content.strip()
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                chunks.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
     except Exception as e:
-        print(f"Pattern explanation error: {e}")
-        return f"{pattern_name}: {pattern_info.get('description', 'Pattern detected but explanation unavailable.')}"
+        logger.warning("Pattern explanation error: %s", e)
+        if not chunks:
+            yield f"{pattern_name}: {pattern_info.get('description', 'Pattern detected but explanation unavailable.')}"
+        return
+    
+    explanation = "".join(chunks).strip()
+    if not explanation:
+        return
+    _EXPLANATION_CACHE.set(cache_key, explanation)
 
 
-def get_pattern_solution(pattern_key: str, code: Optional[str]) -> str:
+async def generate_pattern_explanation(pattern_key: str, code: Optional[str], error: str) -> str:
     """
-    Generate pattern-based solution with best practices.
+    Generate explanation of why this pattern fails.
     
     Args:
         pattern_key: Detected pattern key
-        code: Optional code snippet to correct
+        code: Optional code snippet
+        error: Error message
     
     Returns:
-        Corrected code or solution strategy
+        Detailed pattern explanation
+    """
+    chunks = [chunk async for chunk in stream_pattern_explanation(pattern_key, code, error)]
+    return "".join(chunks).strip()
+
+
+async def stream_pattern_solution(pattern_key: str, code: Optional[str]) -> AsyncIterator[str]:
     """
+    Stream the pattern-based solution as it is generated.
+    
+    The full text is cached once the stream completes; cached solutions are
+    yielded as a single chunk. Yields nothing if generation fails.
+    
+    Args:
+        pattern_key: Detected pattern key
+        code: Optional code snippet to correct
+    
+    Yields:
+        Chunks of the corrected code or solution strategy
+    """
+    cache_key = _cache_key(pattern_key, code)
+    cached = _SOLUTION_CACHE.get(cache_key)
+    if cached is not None:
+        yield cached
+        return
+    
     pattern_info = PATTERN_LIBRARY.get(pattern_key, {})
     
+    # Static instructions first, request-specific details last (prompt-cache friendly)
     prompt = f"""You are a Code Pattern Intelligence System.
 
-**Pattern:** {pattern_info.get('name', '')}
-**User's Code:**
-{code if code else "No code provided"}
-
 **Task:** Provide a PATTERN-BASED solution, not just a code fix.
 
 Include:
@@ -477,51 +966,186 @@ Include:
 
 Return ONLY the corrected code with minimal comments.
 
+**Pattern:** {pattern_info.get('name', '')}
+**User's Code:**
+{code if code else "No code provided"}
+
 **Corrected Code:**"""
 
+    chunks = []
     try:
-        response = OPENAI_CLIENT.chat.completions.create(
+        stream = await OPENAI_CLIENT.chat.completions.create(
             model="gpt-4o",
             messages=[{"role": "user", "content": prompt}],
-            max_tokens=800,
-            temperature=0.4
+            max_tokens=500,  # Corrected code with minimal comments
+            temperature=0.4,
+            stream=True
         )
-        return response.choices[0].message.content.strip()
+        async for chunk in stream:
+            if chunk.choices and chunk.choices[0].delta.content:
+                chunks.append(chunk.choices[0].delta.content)
+                yield chunk.choices[0].delta.content
     except Exception as e:
-        print(f"Solution generation error: {e}")
-        return None
+        logger.warning("Solution generation error: %s", e)
+        return
+    
+    solution = "".join(chunks).strip()
+    if solution:
+        _SOLUTION_CACHE.set(cache_key, solution)
 
 
-def map_pattern_to_search_query(pattern_key: str) -> str:
+async def get_pattern_solution(pattern_key: str, code: Optional[str]) -> str:
     """
-    Convert pattern to optimal search query for external knowledge search.
+    Generate pattern-based solution with best practices.
     
     Args:
         pattern_key: Detected pattern key
+        code: Optional code snippet to correct
     
     Returns:
-        Optimized search query
+        Corrected code or solution strategy (None if generation failed)
+    """
+    solution = "".join([chunk async for chunk in stream_pattern_solution(pattern_key, code)])
+    return solution.strip() or None
+
+
+async def generate_explanation_and_solution(
+    pattern_key: str,
+    code: str,
+    error: str
+) -> Tuple[str, Optional[str]]:
     """
+    Generate the pattern explanation and corrected code in one GPT-4o call.
+    
+    Results are stored in the explanation/solution caches, so later
+    generate_pattern_explanation()/get_pattern_solution() calls for the same
+    input are cache hits. Falls back to the two separate calls if the
+    combined response can't be used.
+    
+    Args:
+        pattern_key: Detected pattern key
+        code: Code snippet to explain and correct
+        error: Error message
+    
+    Returns:
+        Tuple of (explanation, corrected_code)
+    """
+    explanation_key = _cache_key(pattern_key, code, error)
+    solution_key = _cache_key(pattern_key, code)
+    explanation = _EXPLANATION_CACHE.get(explanation_key)
+    solution = _SOLUTION_CACHE.get(solution_key)
+    if explanation is not None and solution is not None:
+        return explanation, solution
+    
     pattern_info = PATTERN_LIBRARY.get(pattern_key, {})
-    name = pattern_info.get("name", "")
-    keywords = pattern_info.get("keywords", [])
     
-    # Combine name and top keywords for search
-    query_parts = [name]
-    if keywords:
-        query_parts.extend(keywords[:3])
+    # Static instructions first, request-specific details last (prompt-cache friendly)
+    prompt = f"""You are a Code Pattern Intelligence System.
+
+**Tasks:**
+1. "explanation": Explain WHY this pattern fails (not what the code does).
+   Focus on the conceptual mistake, why developers make it, and the correct
+   mental model. Keep it concise (3-4 sentences).
+2. "corrected_code": Provide a PATTERN-BASED solution - the corrected code
+   following best practices for this pattern, with a brief comment on the
+   key change. Code only, minimal comments.
+
+Respond with a JSON object: {{"explanation": "...", "corrected_code": "..."}}
+
+**Detected Pattern:** {pattern_info.get('name', 'Unknown Pattern')}
+**Pattern Description:** {pattern_info.get('description', '')}
+
+**Context:**
+{f"Error: {error}" if error else ""}
+**User's Code:**
+{code}"""
+
+    try:
+        response = await OPENAI_CLIENT.chat.completions.create(
+            model="gpt-4o",
+            messages=[{"role": "user", "content": prompt}],
+            max_tokens=700,  # 180 for the explanation + 500 for the code, plus JSON framing
+            temperature=0.4,
+            response_format={"type": "json_object"}
+        )
+        result = json.loads(response.choices[0].message.content)
+        explanation = result["explanation"].strip()
+        solution = result["corrected_code"].strip()
+    except Exception as e:
+        logger.warning("Combined explanation/solution error: %s", e)
+        return tuple(await asyncio.gather(
+            generate_pattern_explanation(pattern_key, code, error),
+            get_pattern_solution(pattern_key, code)
+        ))
+    
+    _EXPLANATION_CACHE.set(explanation_key, explanation)
+    _SOLUTION_CACHE.set(solution_key, solution)
+    return explanation, solution
+
+
+async def full_report(
+    code: Optional[str],
+    error_message: str,
+    user_message: str
+) -> Dict:
+    """
+    Detect the pattern, then generate its explanation and solution.
+    
+    Only detection sits on the critical path; once the pattern key is known
+    the explanation and solution are generated together (one combined call
+    with code, or concurrently without).
+    
+    Args:
+        code: Optional code snippet
+        error_message: Error message or problem description
+        user_message: User's description of the problem
     
-    return " ".join(query_parts)
+    Returns:
+        Dictionary with pattern_key, pattern_name, confidence, explanation and solution
+    """
+    pattern_key, confidence = await detect_pattern(code, error_message, user_message)
+    
+    if code:
+        explanation, solution = await generate_explanation_and_solution(pattern_key, code, error_message)
+    else:
+        explanation, solution = await asyncio.gather(
+            generate_pattern_explanation(pattern_key, code, error_message),
+            get_pattern_solution(pattern_key, code)
+        )
+    
+    return {
+        "pattern_key": pattern_key,
+        "pattern_name": get_pattern_name(pattern_key),
+        "confidence": confidence,
+        "explanation": explanation,
+        "solution": solution
+    }
+
+
+def map_pattern_to_search_query(pattern_key: str) -> str:
+    """
+    Convert pattern to optimal search query for external knowledge search.
+    
+    Args:
+        pattern_key: Detected pattern key
+    
+    Returns:
+        Optimized search query
+    """
+    # Name and top keywords, combined once at import
+    index = _PATTERN_INDEX.get(pattern_key)
+    return _PATTERN_SEARCH_QUERIES[index] if index is not None else ""
 
 
 def get_learning_intent(pattern_key: str) -> str:
     """Get the learning intent for this pattern"""
-    return PATTERN_LIBRARY.get(pattern_key, {}).get(
-        "learning_intent", 
-        "Understanding best practices and avoiding common pitfalls"
-    )
+    index = _PATTERN_INDEX.get(pattern_key)
+    if index is None:
+        return "Understanding best practices and avoiding common pitfalls"
+    return _PATTERN_LEARNING_INTENTS[index]
 
 
 def get_pattern_keywords(pattern_key: str) -> List[str]:
     """Get keywords for a pattern (for video transcript search)"""
-    return PATTERN_LIBRARY.get(pattern_key, {}).get("keywords", [])
+    index = _PATTERN_INDEX.get(pattern_key)
+    return list(_PATTERN_KEYWORDS[index]) if index is not None else []
@@ -4,32 +4,20 @@ Test script to verify YouTube API and Pattern Intelligence System
 
 import sys
 import os
+import asyncio
+import importlib
 
-print("=" * 60)
-print("YOUTUBE API & PATTERN INTELLIGENCE VERIFICATION")
-print("=" * 60)
-
-# Check environment variables
-print("\n1. Checking Environment Variables...")
-youtube_key = os.getenv("YOUTUBE_API_KEY")
-openai_key = os.getenv("OPENAI_API_KEY")
-
-if openai_key:
-    print(f"   ✅ OPENAI_API_KEY is set (length: {len(openai_key)})")
-else:
-    print("   ❌ OPENAI_API_KEY is NOT set")
-
-if youtube_key:
-    print(f"   ✅ YOUTUBE_API_KEY is set (length: {len(youtube_key)})")
-else:
-    print("   ⚠️  YOUTUBE_API_KEY is NOT set (using fallback videos)")
-
-# Test pattern detection
-print("\n2. Testing Pattern Detection...")
-try:
-    import pattern_detector
-    
-    test_code = '''function searchItem(arr, target) {
+
+# Steps 2-5 are independent network probes, so run them concurrently and
+# print each one's report in order once all have finished. Each probe imports
+# its module in a worker thread: the imports load heavy dependencies and would
+# otherwise block the event loop until they finish.
+async def probe_pattern():
+    lines = ["\n2. Testing Pattern Detection..."]
+    try:
+        pattern_detector = await asyncio.to_thread(importlib.import_module, "pattern_detector")
+        
+        test_code = '''function searchItem(arr, target) {
     for (let i = 0; i <= arr.length; i++) {
         if (arr[i] = target) {
             return "Item Found at index " + i
@@ -37,98 +25,137 @@ try:
     }
     return "Item not found"
 }'''
-    
-    result = pattern_detector.detect_primary_and_secondary_patterns(
-        code=test_code,
-        error_message="My search function isn't working",
-        user_message="Need help with search algorithm"
-    )
-    
-    print(f"   ✅ Pattern Detection Working")
-    print(f"   PRIMARY: {result['primary_pattern_name']}")
-    print(f"   SECONDARY: {result['secondary_issues']}")
-    print(f"   Confidence: {result['confidence']}%")
-    
-    # Check if it detects Linear Search specifically
-    if "Linear Search" in result['primary_pattern_name']:
-        print("   ✅ Algorithm-specific detection working (Linear Search)")
-    else:
-        print(f"   ⚠️  Expected 'Linear Search', got: {result['primary_pattern_name']}")
         
-except Exception as e:
-    print(f"   ❌ Pattern Detection Error: {e}")
-
-# Test video transcript analyzer
-print("\n3. Testing Video Transcript Analyzer...")
-try:
-    import video_transcript_analyzer
-    
-    # Test with a known educational video
-    test_url = "https://youtube.com/watch?v=dQw4w9WgXcQ"
-    has_transcript, reason = video_transcript_analyzer.check_audio_availability(test_url)
-    
-    if has_transcript:
-        print(f"   ✅ Transcript checking working")
-    else:
-        print(f"   ℹ️  Transcript unavailable (reason: {reason})")
+        result = await pattern_detector.detect_primary_and_secondary_patterns(
+            code=test_code,
+            error_message="My search function isn't working",
+            user_message="Need help with search algorithm"
+        )
         
-except Exception as e:
-    print(f"   ❌ Transcript Analyzer Error: {e}")
-
-# Test YouTube search
-print("\n4. Testing YouTube Search...")
-try:
-    import asyncio
-    from main import search_youtube
-    
-    async def test_search():
-        videos = await search_youtube("Linear Search algorithm tutorial")
-        return videos
-    
-    videos = asyncio.run(test_search())
-    
-    if videos and len(videos) > 0:
-        print(f"   ✅ YouTube Search Working - Found {len(videos)} videos")
-        print(f"   Sample: {videos[0].get('title', 'N/A')[:50]}...")
+        lines.append(f"   ✅ Pattern Detection Working")
+        lines.append(f"   PRIMARY: {result['primary_pattern_name']}")
+        lines.append(f"   SECONDARY: {result['secondary_issues']}")
+        lines.append(f"   Confidence: {result['confidence']}%")
         
-        if youtube_key:
-            print("   ✅ Using REAL YouTube API")
+        # Check if it detects Linear Search specifically
+        if "Linear Search" in result['primary_pattern_name']:
+            lines.append("   ✅ Algorithm-specific detection working (Linear Search)")
         else:
-            print("   ⚠️  Using FALLBACK videos (set YOUTUBE_API_KEY for real videos)")
-    else:
-        print("   ❌ No videos returned")
+            lines.append(f"   ⚠️  Expected 'Linear Search', got: {result['primary_pattern_name']}")
+            
+    except Exception as e:
+        lines.append(f"   ❌ Pattern Detection Error: {e}")
+    return lines
+
+
+async def probe_transcript():
+    lines = ["\n3. Testing Video Transcript Analyzer..."]
+    try:
+        video_transcript_analyzer = await asyncio.to_thread(importlib.import_module, "video_transcript_analyzer")
+        
+        # Test with a known educational video
+        test_url = "https://youtube.com/watch?v=dQw4w9WgXcQ"
+        has_transcript, reason = await asyncio.to_thread(
+            video_transcript_analyzer.check_audio_availability, test_url
+        )
+        
+        if has_transcript:
+            lines.append(f"   ✅ Transcript checking working")
+        else:
+            lines.append(f"   ℹ️  Transcript unavailable (reason: {reason})")
+            
+    except Exception as e:
+        lines.append(f"   ❌ Transcript Analyzer Error: {e}")
+    return lines
+
+
+async def probe_youtube(youtube_key):
+    lines = ["\n4. Testing YouTube Search..."]
+    try:
+        main = await asyncio.to_thread(importlib.import_module, "main")
+        
+        videos = await main.search_youtube("Linear Search algorithm tutorial")
+        
+        if videos and len(videos) > 0:
+            lines.append(f"   ✅ YouTube Search Working - Found {len(videos)} videos")
+            lines.append(f"   Sample: {videos[0].get('title', 'N/A')[:50]}...")
+            
+            if youtube_key:
+                lines.append("   ✅ Using REAL YouTube API")
+            else:
+                lines.append("   ⚠️  Using FALLBACK videos (set YOUTUBE_API_KEY for real videos)")
+        else:
+            lines.append("   ❌ No videos returned")
+            
+    except Exception as e:
+        lines.append(f"   ❌ YouTube Search Error: {e}")
+    return lines
+
+
+async def probe_knowledge():
+    lines = ["\n5. Testing External Knowledge Search..."]
+    try:
+        knowledge_search = await asyncio.to_thread(importlib.import_module, "knowledge_search")
+        
+        results = await asyncio.to_thread(knowledge_search.get_external_knowledge, "Linear Search algorithm")
         
-except Exception as e:
-    print(f"   ❌ YouTube Search Error: {e}")
-
-# Test external knowledge search
-print("\n5. Testing External Knowledge Search...")
-try:
-    import knowledge_search
-    
-    results = knowledge_search.get_external_knowledge("Linear Search algorithm")
-    
-    github_count = len(results.get("github_repos", []))
-    so_count = len(results.get("stackoverflow_threads", []))
-    dev_count = len(results.get("dev_articles", []))
-    
-    print(f"   ✅ External Knowledge Search Working")
-    print(f"   GitHub repos: {github_count}")
-    print(f"   StackOverflow threads: {so_count}")
-    print(f"   Dev articles: {dev_count}")
-    
-except Exception as e:
-    print(f"   ❌ External Knowledge Error: {e}")
-
-print("\n" + "=" * 60)
-print("VERIFICATION COMPLETE")
-print("=" * 60)
-
-# Summary
-print("\n📊 SYSTEM STATUS SUMMARY:")
-print(f"Pattern Detection: {'✅ Working' if 'pattern_detector' in sys.modules else '❌ Failed'}")
-print(f"Transcript Analysis: {'✅ Working' if 'video_transcript_analyzer' in sys.modules else '❌ Failed'}")
-print(f"YouTube API: {'✅ Real API' if youtube_key else '⚠️  Fallback Mode'}")
-print(f"External Knowledge: {'✅ Working' if 'knowledge_search' in sys.modules else '❌ Failed'}")
-
-print("\n✨ System is ready for pattern-based code analysis!")
+        github_count = len(results.get("github_repos", []))
+        so_count = len(results.get("stackoverflow_threads", []))
+        dev_count = len(results.get("dev_articles", []))
+        
+        lines.append(f"   ✅ External Knowledge Search Working")
+        lines.append(f"   GitHub repos: {github_count}")
+        lines.append(f"   StackOverflow threads: {so_count}")
+        lines.append(f"   Dev articles: {dev_count}")
+        
+    except Exception as e:
+        lines.append(f"   ❌ External Knowledge Error: {e}")
+    return lines
+
+
+async def run_probes(youtube_key):
+    return await asyncio.gather(
+        probe_pattern(), probe_transcript(), probe_youtube(youtube_key), probe_knowledge()
+    )
+
+
+def main():
+    print("=" * 60)
+    print("YOUTUBE API & PATTERN INTELLIGENCE VERIFICATION")
+    print("=" * 60)
+
+    # Check environment variables
+    print("\n1. Checking Environment Variables...")
+    youtube_key = os.getenv("YOUTUBE_API_KEY")
+    openai_key = os.getenv("OPENAI_API_KEY")
+
+    if openai_key:
+        print(f"   ✅ OPENAI_API_KEY is set (length: {len(openai_key)})")
+    else:
+        print("   ❌ OPENAI_API_KEY is NOT set")
+
+    if youtube_key:
+        print(f"   ✅ YOUTUBE_API_KEY is set (length: {len(youtube_key)})")
+    else:
+        print("   ⚠️  YOUTUBE_API_KEY is NOT set (using fallback videos)")
+
+    print("\nRunning checks 2-5 concurrently...")
+    for report in asyncio.run(run_probes(youtube_key)):
+        print("\n".join(report))
+
+    print("\n" + "=" * 60)
+    print("VERIFICATION COMPLETE")
+    print("=" * 60)
+
+    # Summary
+    print("\n📊 SYSTEM STATUS SUMMARY:")
+    print(f"Pattern Detection: {'✅ Working' if 'pattern_detector' in sys.modules else '❌ Failed'}")
+    print(f"Transcript Analysis: {'✅ Working' if 'video_transcript_analyzer' in sys.modules else '❌ Failed'}")
+    print(f"YouTube API: {'✅ Real API' if youtube_key else '⚠️  Fallback Mode'}")
+    print(f"External Knowledge: {'✅ Working' if 'knowledge_search' in sys.modules else '❌ Failed'}")
+
+    print("\n✨ System is ready for pattern-based code analysis!")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,94 @@
+"""
+Transcript Cache Module
+Persists per-video solution timestamps in SQLite so they survive restarts
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+from typing import Dict, List, Optional
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CACHE_DB_PATH = os.environ.get("TRANSCRIPT_CACHE_DB", os.path.join(BASE_DIR, "transcript_cache.db"))
+CACHE_MAX_AGE = 7 * 24 * 3600  # seconds; transcripts rarely change after upload
+
+# sqlite3 connections must not be shared across threads, and the chat
+# pipeline runs lookups in worker threads - keep one connection per thread
+_local = threading.local()
+
+
+def _get_connection() -> sqlite3.Connection:
+    """Open (once per thread) the cache database in WAL mode"""
+    conn = getattr(_local, "conn", None)
+    if conn is None:
+        conn = sqlite3.connect(CACHE_DB_PATH, timeout=5)
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute("PRAGMA synchronous=NORMAL")
+        conn.execute(
+            """CREATE TABLE IF NOT EXISTS solution_timestamps (
+                video_id TEXT NOT NULL,
+                keywords_hash TEXT NOT NULL,
+                payload TEXT NOT NULL,
+                created_at REAL NOT NULL,
+                PRIMARY KEY (video_id, keywords_hash)
+            )"""
+        )
+        # Stale rows are never served, so drop them instead of letting the file grow
+        conn.execute("DELETE FROM solution_timestamps WHERE created_at < ?", (time.time() - CACHE_MAX_AGE,))
+        conn.commit()
+        _local.conn = conn
+    return conn
+
+
+def keywords_hash(pattern_keywords: List[str]) -> str:
+    """Stable hash of a keyword list (order-insensitive, case-insensitive)"""
+    normalized = sorted(kw.lower() for kw in pattern_keywords)
+    return hashlib.sha1(json.dumps(normalized).encode("utf-8")).hexdigest()
+
+
+def get(video_id: str, key_hash: str) -> Optional[Dict]:
+    """
+    Look up cached solution timestamps.
+
+    Args:
+        video_id: YouTube video ID
+        key_hash: Hash from keywords_hash() for the pattern keywords
+
+    Returns:
+        The cached extract_solution_timestamps() result, or None if missing/stale
+    """
+    try:
+        row = _get_connection().execute(
+            "SELECT payload, created_at FROM solution_timestamps WHERE video_id = ? AND keywords_hash = ?",
+            (video_id, key_hash)
+        ).fetchone()
+    except sqlite3.Error as e:
+        print(f"⚠️ Transcript cache read failed: {e}")
+        return None
+
+    if row is None or time.time() - row[1] > CACHE_MAX_AGE:
+        return None
+    return json.loads(row[0])
+
+
+def put(video_id: str, key_hash: str, timestamps: Dict) -> None:
+    """
+    Store solution timestamps for a video/keyword combination.
+
+    Args:
+        video_id: YouTube video ID
+        key_hash: Hash from keywords_hash() for the pattern keywords
+        timestamps: extract_solution_timestamps() result
+    """
+    try:
+        conn = _get_connection()
+        conn.execute(
+            "INSERT OR REPLACE INTO solution_timestamps (video_id, keywords_hash, payload, created_at) VALUES (?, ?, ?, ?)",
+            (video_id, key_hash, json.dumps(timestamps), time.time())
+        )
+        conn.commit()
+    except sqlite3.Error as e:
+        print(f"⚠️ Transcript cache write failed: {e}")
@@ -3,9 +3,84 @@ Video Transcript Analyzer Module
 Fetches YouTube transcripts and extracts pattern-specific timestamps
 """
 
-from typing import Optional, Dict, List, Tuple
+from typing import Any, Callable, Optional, Dict, List, Tuple
+import numpy as np
 from youtube_transcript_api import YouTubeTranscriptApi
+import random
 import re
+import threading
+import time
+from bisect import bisect_left, bisect_right
+from collections import Counter
+from functools import lru_cache
+from cache_utils import TTLCache
+from keyword_matcher import KeywordAutomaton
+
+# Transcripts rarely change, so keep them per video_id to skip repeat YouTube round-trips
+TRANSCRIPT_CACHE_TTL = 3600  # seconds
+_transcript_cache = TTLCache(maxsize=2048, ttl=TRANSCRIPT_CACHE_TTL)
+
+# Pace transcript requests so bursts of chat requests don't trip YouTube's HTTP 429
+TRANSCRIPT_REQUESTS_PER_SECOND = 5
+TRANSCRIPT_MAX_RETRIES = 3
+TRANSCRIPT_RETRY_BASE_DELAY = 1.0  # seconds, doubled on each retry
+
+# Consecutive off-topic segments after which the solution window stops growing
+END_LOOKAHEAD_MAX_MISSES = 3
+
+_rate_lock = threading.Lock()
+_rate_tokens = float(TRANSCRIPT_REQUESTS_PER_SECOND)
+_rate_updated = time.monotonic()
+
+
+def _acquire_request_slot() -> None:
+    """Block until the token bucket allows another YouTube request"""
+    global _rate_tokens, _rate_updated
+    while True:
+        with _rate_lock:
+            now = time.monotonic()
+            _rate_tokens = min(
+                TRANSCRIPT_REQUESTS_PER_SECOND,
+                _rate_tokens + (now - _rate_updated) * TRANSCRIPT_REQUESTS_PER_SECOND
+            )
+            _rate_updated = now
+            if _rate_tokens >= 1:
+                _rate_tokens -= 1
+                return
+            wait = (1 - _rate_tokens) / TRANSCRIPT_REQUESTS_PER_SECOND
+        time.sleep(wait)
+
+
+def _is_rate_limited(error: Exception) -> bool:
+    message = str(error).lower()
+    return type(error).__name__ == "TooManyRequests" or "429" in message or "too many requests" in message
+
+
+def _youtube_call(func: Callable, *args, **kwargs) -> Any:
+    """
+    Call a YouTube transcript API function under the rate limit.
+    
+    Retries HTTP 429 responses with exponential backoff plus jitter;
+    any other error is raised immediately.
+    """
+    delay = TRANSCRIPT_RETRY_BASE_DELAY
+    for attempt in range(TRANSCRIPT_MAX_RETRIES + 1):
+        _acquire_request_slot()
+        try:
+            return func(*args, **kwargs)
+        except Exception as e:
+            if attempt == TRANSCRIPT_MAX_RETRIES or not _is_rate_limited(e):
+                raise
+            print(f"⚠️ YouTube rate limited, retrying in ~{delay:.1f}s")
+            time.sleep(delay + random.random())
+            delay *= 2
+
+
+# Compiled once at import rather than looked up in re's cache on every call
+_VIDEO_ID_PATTERNS = (
+    re.compile(r'(?:youtube\.com/watch\?v=|youtu\.be/)([^&\n?]*)'),
+    re.compile(r'youtube\.com/embed/([^&\n?]*)'),
+)
 
 
 def extract_video_id(url: str) -> Optional[str]:
@@ -18,13 +93,8 @@ def extract_video_id(url: str) -> Optional[str]:
     Returns:
         Video ID or None
     """
-    patterns = [
-        r'(?:youtube\.com/watch\?v=|youtu\.be/)([^&\n?]*)',
-        r'youtube\.com/embed/([^&\n?]*)',
-    ]
-    
-    for pattern in patterns:
-        match = re.search(pattern, url)
+    for pattern in _VIDEO_ID_PATTERNS:
+        match = pattern.search(url)
         if match:
             return match.group(1)
     return None
@@ -44,15 +114,22 @@ def check_audio_availability(video_url: str) -> Tuple[bool, Optional[str]]:
     if not video_id:
         return False, "Invalid video URL"
     
+    # A transcript we already hold answers this offline
+    if _transcript_cache.get(video_id) is not None:
+        return True, None
+    
     try:
         # Try to get transcript - first try without language code (auto-detect)
         try:
-            YouTubeTranscriptApi.get_transcript(video_id)
+            transcript = _youtube_call(YouTubeTranscriptApi.get_transcript, video_id)
+            # Keep what we fetched so the following get_video_transcript() is a cache hit
+            if transcript:
+                _transcript_cache.set(video_id, transcript)
             return True, None
         except Exception:
             # If that fails, try to list available transcripts
             try:
-                transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+                transcript_list = _youtube_call(YouTubeTranscriptApi.list_transcripts, video_id)
                 # Check if any transcript is available
                 for t in transcript_list:
                     return True, None
@@ -90,24 +167,36 @@ def get_video_transcript(video_url: str) -> Optional[List[Dict]]:
         print(f"❌ Invalid video URL: {video_url}")
         return None
     
+    cached = _transcript_cache.get(video_id)
+    if cached is not None:
+        return cached
+    
+    transcript = _fetch_video_transcript(video_id)
+    if transcript:
+        _transcript_cache.set(video_id, transcript)
+    return transcript
+
+
+def _fetch_video_transcript(video_id: str) -> Optional[List[Dict]]:
+    """Fetch a transcript from YouTube, trying direct, listed and language-code lookups"""
     try:
         # Try to get transcript - first try without language code (auto-detect)
         try:
-            transcript = YouTubeTranscriptApi.get_transcript(video_id)
+            transcript = _youtube_call(YouTubeTranscriptApi.get_transcript, video_id)
             print(f"✅ Successfully fetched transcript for {video_id}")
             return transcript
         except Exception as e1:
             print(f"⚠️ Direct transcript fetch failed for {video_id}: {e1}")
             # If that fails, try to get available transcripts and use the first one
             try:
-                transcript_list = YouTubeTranscriptApi.list_transcripts(video_id)
+                transcript_list = _youtube_call(YouTubeTranscriptApi.list_transcripts, video_id)
                 print(f"📋 Found transcript list for {video_id}, trying to fetch...")
                 
                 # Try to get manually created transcript first, then auto-generated
                 transcript = None
                 for t in transcript_list:
                     try:
-                        transcript = t.fetch()
+                        transcript = _youtube_call(t.fetch)
                         print(f"✅ Successfully fetched {t.language_code} transcript (manual)")
                         break
                     except Exception as fetch_err:
@@ -119,7 +208,7 @@ def get_video_transcript(video_url: str) -> Optional[List[Dict]]:
                     for t in transcript_list:
                         try:
                             if hasattr(t, 'translate'):
-                                transcript = t.translate('en').fetch()
+                                transcript = _youtube_call(t.translate('en').fetch)
                                 print(f"✅ Successfully fetched translated transcript")
                                 break
                         except Exception as translate_err:
@@ -137,7 +226,7 @@ def get_video_transcript(video_url: str) -> Optional[List[Dict]]:
                 common_languages = ['en', 'en-US', 'en-GB']
                 for lang in common_languages:
                     try:
-                        transcript = YouTubeTranscriptApi.get_transcript(video_id, languages=[lang])
+                        transcript = _youtube_call(YouTubeTranscriptApi.get_transcript, video_id, languages=[lang])
                         print(f"✅ Successfully fetched transcript with language code: {lang}")
                         return transcript
                     except:
@@ -148,10 +237,59 @@ def get_video_transcript(video_url: str) -> Optional[List[Dict]]:
         return None
 
 
+@lru_cache(maxsize=128)
+def _keyword_matcher(keywords_lower: Tuple[str, ...]) -> KeywordAutomaton:
+    """Build (once per keyword list) the automaton used to scan transcripts"""
+    return KeywordAutomaton(keywords_lower)
+
+
+def segment_keyword_hits(transcript: List[Dict], pattern_keywords: List[str]) -> List[int]:
+    """
+    Count keyword occurrences in each transcript segment (case-insensitive).
+    
+    Scores are frequency-weighted - the sum of `text.count(keyword)` over the
+    keywords - so a segment that keeps mentioning the pattern outranks one
+    that names it in passing. The whole transcript is scanned once with an
+    Aho-Corasick automaton and each hit is mapped back to its segment by
+    binary search over segment offsets.
+    
+    Args:
+        transcript: List of transcript segments
+        pattern_keywords: Keywords to search for
+    
+    Returns:
+        Number of keyword occurrences per segment, in transcript order
+    """
+    keywords_lower = [kw.lower() for kw in pattern_keywords]
+    multiplicity = Counter(keywords_lower)
+    # Keyword lists come from the pattern library, so the same few automata are reused
+    matcher = _keyword_matcher(tuple(keywords_lower))
+    
+    # Segments joined by newlines (keywords never span one); offsets[i] is where segment i starts
+    texts = [segment['text'].lower() for segment in transcript]
+    offsets = []
+    position = 0
+    for text in texts:
+        offsets.append(position)
+        position += len(text) + 1
+    
+    # Skip overlapping repeats of the same keyword, as str.count does
+    hits = [0] * len(transcript)
+    next_free = [0] * len(matcher.keywords)
+    for end, index in matcher.iter("\n".join(texts)):
+        keyword = matcher.keywords[index]
+        start = end - len(keyword) + 1
+        if start >= next_free[index]:
+            next_free[index] = end + 1
+            hits[bisect_right(offsets, start) - 1] += multiplicity[keyword]
+    return hits
+
+
 def find_pattern_in_transcript(
     transcript: List[Dict],
     pattern_name: str,
-    pattern_keywords: List[str]
+    pattern_keywords: List[str],
+    keyword_hits: Optional[List[int]] = None
 ) -> Optional[Tuple[float, float]]:
     """
     Find timestamps where pattern is explained in transcript.
@@ -160,6 +298,7 @@ def find_pattern_in_transcript(
         transcript: List of transcript segments
         pattern_name: Name of the pattern
         pattern_keywords: Keywords to search for
+        keyword_hits: Precomputed segment_keyword_hits() result, if available
     
     Returns:
         Tuple of (start_time, end_time) or None
@@ -167,34 +306,35 @@ def find_pattern_in_transcript(
     if not transcript:
         return None
     
-    # Convert keywords to lowercase for case-insensitive matching
-    keywords_lower = [kw.lower() for kw in pattern_keywords]
-    
     # Score each segment based on keyword matches
-    segment_scores = []
-    for i, segment in enumerate(transcript):
-        text_lower = segment['text'].lower()
-        score = sum(1 for kw in keywords_lower if kw in text_lower)
-        segment_scores.append((i, score, segment['start']))
-    
-    # Find segment with highest score
-    if not segment_scores or max(seg[1] for seg in segment_scores) == 0:
-        # No matches found, return first 2 minutes as default
+    if keyword_hits is None:
+        keyword_hits = segment_keyword_hits(transcript, pattern_keywords)
+    
+    # Find segment with highest score (argmax returns the first best, like list.index)
+    scores = np.asarray(keyword_hits, dtype=np.int32)
+    if scores.max() == 0:
+        # No keyword matches, return first 2 minutes as default
         return (0, min(120, transcript[-1]['start'] + transcript[-1].get('duration', 5)))
+    best_segment_idx = int(scores.argmax())
     
     # Get best match segment
-    best_segment_idx = max(segment_scores, key=lambda x: x[1])[0]
     best_segment = transcript[best_segment_idx]
     
     # Expand to include context (±10-20 seconds)
     start_time = max(0, best_segment['start'] - 15)
     
-    # Find end time by looking ahead for related content
+    # Find end time by looking ahead for related content, stopping once the
+    # topic has gone quiet for a few segments
     end_idx = best_segment_idx
-    for i in range(best_segment_idx, min(best_segment_idx + 10, len(transcript))):
-        text_lower = transcript[i]['text'].lower()
-        if any(kw in text_lower for kw in keywords_lower):
+    misses = 0
+    for i in range(best_segment_idx + 1, min(best_segment_idx + 10, len(transcript))):
+        if scores[i]:
             end_idx = i
+            misses = 0
+        else:
+            misses += 1
+            if misses >= END_LOOKAHEAD_MAX_MISSES:
+                break
     
     end_segment = transcript[end_idx]
     end_time = end_segment['start'] + end_segment.get('duration', 5) + 15
@@ -206,6 +346,13 @@ def find_pattern_in_transcript(
     return (start_time, end_time)
 
 
+def format_time(seconds: float) -> str:
+    """Format seconds as MM:SS"""
+    mins = int(seconds // 60)
+    secs = int(seconds % 60)
+    return f"{mins}:{secs:02d}"
+
+
 def extract_solution_timestamps(
     video_url: str,
     pattern_name: str,
@@ -224,7 +371,7 @@ def extract_solution_timestamps(
                    transcript_text, highlighted_portion}
         or None if transcript unavailable
     """
-    # Check availability first
+    # Check availability first (its fetch is cached, so this costs one round-trip in total)
     has_transcript, reason = check_audio_availability(video_url)
     if not has_transcript:
         return None
@@ -235,39 +382,28 @@ def extract_solution_timestamps(
         return None
     
     # Find pattern timestamps
-    timestamps = find_pattern_in_transcript(transcript, pattern_name, pattern_keywords)
+    keyword_hits = segment_keyword_hits(transcript, pattern_keywords)
+    timestamps = find_pattern_in_transcript(transcript, pattern_name, pattern_keywords, keyword_hits)
     if not timestamps:
         return None
     
     start_time, end_time = timestamps
     
-    # Format timestamps as MM:SS
-    def format_time(seconds: float) -> str:
-        mins = int(seconds // 60)
-        secs = int(seconds % 60)
-        return f"{mins}:{secs:02d}"
+    # Build full transcript, one "[MM:SS] text" line per segment
+    full_transcript_text = [
+        f"[{format_time(segment['start'])}] {segment['text']}" for segment in transcript
+    ]
     
-    # Extract transcript text for the solution section
-    solution_text = []
-    full_transcript_text = []
-    keywords_lower = [kw.lower() for kw in pattern_keywords]
+    # Segments are time-ordered, so the solution window is a contiguous slice
+    starts = [segment['start'] for segment in transcript]
+    lo = bisect_left(starts, start_time)
+    hi = bisect_right(starts, end_time)
     
-    for segment in transcript:
-        segment_time = segment['start']
-        segment_text = segment['text']
-        
-        # Build full transcript
-        timestamp_str = format_time(segment_time)
-        full_transcript_text.append(f"[{timestamp_str}] {segment_text}")
-        
-        # Extract solution portion (within our timestamp range)
-        if start_time <= segment_time <= end_time:
-            # Check if this segment contains keywords (HIGHLIGHT)
-            has_keywords = any(kw in segment_text.lower() for kw in keywords_lower)
-            if has_keywords:
-                solution_text.append(f"**[{timestamp_str}] {segment_text}**")  # Highlighted
-            else:
-                solution_text.append(f"[{timestamp_str}] {segment_text}")
+    # Extract solution portion, highlighting segments that contain keywords
+    solution_text = [
+        f"**{line}**" if hits else line
+        for line, hits in zip(full_transcript_text[lo:hi], keyword_hits[lo:hi])
+    ]
     
     return {
         "start_time": start_time,
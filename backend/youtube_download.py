@@ -1,7 +1,41 @@
 import yt_dlp
 import os
 import json
+import logging
+import shutil
+import time
 from pathlib import Path
+from urllib.parse import urlparse
+
+# Hand downloads to aria2c's multi-connection downloader when opted in and installed
+USE_ARIA2C = os.environ.get("YTDLP_USE_ARIA2C", "").lower() in ("1", "true", "yes")
+
+# #region agent log
+_DEBUG_LOG_DIR = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.cursor')
+_DEBUG_LOG_PATH = os.path.join(_DEBUG_LOG_DIR, 'debug.log')
+try:
+    os.makedirs(_DEBUG_LOG_DIR, exist_ok=True)
+except OSError as e:
+    print(f"DEBUG LOG ERROR: {e}")
+
+
+# One file handle for the whole process (opened on the first event), not one open() per event
+_debug_handler = logging.FileHandler(_DEBUG_LOG_PATH, encoding='utf-8', delay=True)
+_debug_handler.setFormatter(logging.Formatter('%(message)s'))
+_debug_logger = logging.getLogger(f"{__name__}.debug")
+_debug_logger.addHandler(_debug_handler)
+_debug_logger.setLevel(logging.DEBUG)
+_debug_logger.propagate = False  # The trace goes to debug.log only, not the app's console log
+
+
+def _debug_log(hypothesis_id: str, location: str, message: str, data: dict) -> None:
+    """Append one JSON event to the debug trace; logging failures never break a download"""
+    try:
+        _debug_logger.debug(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":hypothesis_id,"location":location,"message":message,"data":data,"timestamp":int(time.time()*1000)}))
+    except Exception as e:
+        print(f"DEBUG LOG ERROR: {e}")
+# #endregion
+
 
 
 def download_youtube_video(url: str, output_path: str = "data/video.mp4", try_audio_only: bool = False) -> str:
@@ -21,14 +55,7 @@ def download_youtube_video(url: str, output_path: str = "data/video.mp4", try_au
         Exception: If download fails
     """
     # #region agent log
-    import time
-    log_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.cursor', 'debug.log')
-    try:
-        os.makedirs(os.path.dirname(log_path), exist_ok=True)
-        with open(log_path, 'a', encoding='utf-8') as f:
-            f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"A","location":"youtube_download.py:20","message":"download_youtube_video called","data":{"url":url,"output_path":output_path},"timestamp":int(time.time()*1000)})+'\n')
-    except Exception as e:
-        print(f"DEBUG LOG ERROR: {e}")
+    _debug_log("A", "youtube_download.py:20", "download_youtube_video called", {"url":url,"output_path":output_path})
     # #endregion
     print(f"📥 Downloading video from: {url}")
     
@@ -43,6 +70,7 @@ def download_youtube_video(url: str, output_path: str = "data/video.mp4", try_au
     else:
         format_selector = 'bestvideo[height<=1080]+bestaudio/best[height<=1080]'
     
+    downloaded = {}
     ydl_opts = {
         'format': format_selector,
         'outtmpl': output_path,
@@ -58,6 +86,10 @@ def download_youtube_video(url: str, output_path: str = "data/video.mp4", try_au
                 'player_skip': ['webpage', 'configs'],
             }
         },
+        # Fetch DASH/HLS fragments in parallel and stream large files in 10 MiB ranged requests
+        'concurrent_fragment_downloads': 8,
+        'http_chunk_size': 10 * 1024 * 1024,
+        'buffersize': 1024 * 1024,
         # Retry options
         'retries': 3,
         'fragment_retries': 3,
@@ -71,39 +103,25 @@ def download_youtube_video(url: str, output_path: str = "data/video.mp4", try_au
             'Keep-Alive': '300',
             'Connection': 'keep-alive',
         },
+        # yt-dlp reports the final file (after any merge/remux), extension included
+        'post_hooks': [lambda filepath: downloaded.update(path=filepath)],
     }
+    if USE_ARIA2C and shutil.which('aria2c'):
+        ydl_opts['external_downloader'] = 'aria2c'
+        ydl_opts['external_downloader_args'] = ['-x', '8', '-s', '8']
     
     try:
         # #region agent log
-        log_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.cursor', 'debug.log')
-        try:
-            os.makedirs(os.path.dirname(log_path), exist_ok=True)
-            with open(log_path, 'a', encoding='utf-8') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"B","location":"youtube_download.py:57","message":"Before yt_dlp download attempt","data":{"url":url,"has_user_agent":'user_agent' in ydl_opts},"timestamp":int(time.time()*1000)})+'\n')
-        except Exception as e:
-            print(f"DEBUG LOG ERROR: {e}")
+        _debug_log("B", "youtube_download.py:57", "Before yt_dlp download attempt", {"url":url,"has_user_agent":'user_agent' in ydl_opts})
         # #endregion
         with yt_dlp.YoutubeDL(ydl_opts) as ydl:
             # Download the video
             ydl.download([url])
         
-        # Find the actual downloaded file (yt-dlp might add extensions)
-        base_path = os.path.splitext(output_path)[0]  # Remove extension
-        possible_extensions = ['.mp4', '.webm', '.mkv', '.avi', '.m4a', '.opus', '.mp3', '.wav']
+        # The actual downloaded file (yt-dlp might add or change the extension)
+        actual_file = downloaded.get('path')
         
-        actual_file = None
-        for ext in possible_extensions:
-            test_path = base_path + ext
-            if os.path.exists(test_path):
-                actual_file = test_path
-                break
-            # Also check if yt-dlp added extension to the full path
-            test_path = output_path + ext
-            if os.path.exists(test_path):
-                actual_file = test_path
-                break
-        
-        if actual_file:
+        if actual_file and os.path.exists(actual_file):
             print(f"✅ Video downloaded successfully to: {actual_file}")
             return actual_file
         else:
@@ -112,30 +130,22 @@ def download_youtube_video(url: str, output_path: str = "data/video.mp4", try_au
         
     except yt_dlp.DownloadError as e:
         # #region agent log
-        log_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.cursor', 'debug.log')
-        try:
-            os.makedirs(os.path.dirname(log_path), exist_ok=True)
-            with open(log_path, 'a', encoding='utf-8') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"C","location":"youtube_download.py:84","message":"yt_dlp.DownloadError caught","data":{"error_type":"yt_dlp.DownloadError","error_msg":str(e),"error_lower":str(e).lower()},"timestamp":int(time.time()*1000)})+'\n')
-        except Exception as log_e:
-            print(f"DEBUG LOG ERROR: {log_e}")
+        _debug_log("C", "youtube_download.py:84", "yt_dlp.DownloadError caught", {"error_type":"yt_dlp.DownloadError","error_msg":str(e),"error_lower":str(e).lower()})
         # #endregion
         print(f"❌ Download error: {str(e)}")
         raise Exception(f"Failed to download video: {str(e)}")
     except Exception as e:
         # #region agent log
-        log_path = os.path.join(os.path.dirname(os.path.dirname(__file__)), '.cursor', 'debug.log')
-        try:
-            os.makedirs(os.path.dirname(log_path), exist_ok=True)
-            with open(log_path, 'a', encoding='utf-8') as f:
-                f.write(json.dumps({"sessionId":"debug-session","runId":"run1","hypothesisId":"D","location":"youtube_download.py:87","message":"Generic Exception caught","data":{"error_type":type(e).__name__,"error_msg":str(e),"error_lower":str(e).lower()},"timestamp":int(time.time()*1000)})+'\n')
-        except Exception as log_e:
-            print(f"DEBUG LOG ERROR: {log_e}")
+        _debug_log("D", "youtube_download.py:87", "Generic Exception caught", {"error_type":type(e).__name__,"error_msg":str(e),"error_lower":str(e).lower()})
         # #endregion
         print(f"❌ Unexpected error during download: {str(e)}")
         raise
 
 
+# Hosts that serve YouTube videos; matched against the parsed host, not the raw string
+_YOUTUBE_HOSTS = frozenset({'youtube.com', 'www.youtube.com', 'm.youtube.com', 'youtu.be'})
+
+
 def is_valid_youtube_url(url: str) -> bool:
     """
     Check if the provided URL is a valid YouTube URL.
@@ -146,15 +156,10 @@ def is_valid_youtube_url(url: str) -> bool:
     Returns:
         True if URL is a valid YouTube URL, False otherwise
     """
-    youtube_domains = ['youtube.com', 'youtu.be', 'www.youtube.com', 'm.youtube.com']
-    url_lower = url.lower().strip()
-    
-    if not url_lower.startswith(('http://', 'https://')):
+    try:
+        parsed = urlparse(url.strip())
+        hostname = parsed.hostname
+    except ValueError:  # e.g. an unbalanced IPv6 "[" in the host
         return False
-    
-    for domain in youtube_domains:
-        if domain in url_lower:
-            return True
-    
-    return False
+    return parsed.scheme in ('http', 'https') and hostname in _YOUTUBE_HOSTS
 
@@ -7,6 +7,64 @@ const chatApi = {
       code
     });
     return response.data;
+  },
+
+  // Streams /chat/stream (Server-Sent Events). onStage(stage, fields) is called
+  // as each pipeline stage finishes; resolves with the full response.
+  async chatStream(message, code = null, onStage = () => {}) {
+    const token = localStorage.getItem('token');
+    const response = await fetch(`${api.defaults.baseURL}/chat/stream`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        ...(token ? { Authorization: `Bearer ${token}` } : {}),
+      },
+      credentials: 'include',
+      body: JSON.stringify({ message, code }),
+    });
+
+    if (!response.ok) {
+      const body = await response.json().catch(() => ({}));
+      if (response.status === 401) {
+        localStorage.removeItem('token');
+      }
+      throw { response: { status: response.status, data: body } };
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { done, value } = await reader.read();
+      if (done) break;
+      buffer += decoder.decode(value, { stream: true });
+
+      // Events are separated by a blank line
+      let boundary;
+      while ((boundary = buffer.indexOf('\n\n')) !== -1) {
+        const rawEvent = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+
+        let stage = 'message';
+        let data = '';
+        for (const line of rawEvent.split('\n')) {
+          if (line.startsWith('event: ')) stage = line.slice(7);
+          else if (line.startsWith('data: ')) data += line.slice(6);
+        }
+        const fields = data ? JSON.parse(data) : {};
+
+        if (stage === 'error') {
+          throw { response: { data: fields } };
+        }
+        if (stage === 'complete') {
+          return fields;
+        }
+        onStage(stage, fields);
+      }
+    }
+
+    throw new Error('Chat stream ended before the response was complete');
   }
 };
 
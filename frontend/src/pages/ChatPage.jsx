@@ -21,7 +21,18 @@ function ChatPage() {
     setResponse(null);
 
     try {
-      const result = await chatApi.chat(message, code || null);
+      // Render each pipeline stage as soon as the backend finishes it
+      const result = await chatApi.chatStream(message, code || null, (stage, fields) => {
+        if (stage === 'explanation_delta') {
+          // Explanation text arrives in pieces before its `explanation` stage
+          setResponse((prev) => ({
+            ...(prev || {}),
+            primary_pattern_explanation: (prev?.primary_pattern_explanation || '') + fields.delta,
+          }));
+          return;
+        }
+        setResponse((prev) => ({ ...(prev || {}), ...fields }));
+      });
       setResponse(result);
     } catch (err) {
       setError(err.response?.data?.detail || 'Failed to get response. Please try again.');
@@ -431,7 +442,7 @@ function ChatPage() {
                     </details>
                   )}
                 </div>
-              ) : response && (
+              ) : response.video_segments && (
                 <div className="bg-[#111111] border border-[#2a2a2a] rounded-xl p-6">
                   <h2 className="text-xl font-bold text-purple-400 mb-4">🎥 Pattern-Specific Videos</h2>
                   <p className="text-gray-400">